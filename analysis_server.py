@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Resident analysis server for the agent-driven triage flow.
+
+Keeps the bucket_owners index, the Makefile order caches and recent
+analysis results warm in one process and answers analyze / report
+requests over a local Unix socket, so repeated calls skip interpreter
+start-up, imports and re-parsing. Use analyze_client.py as a drop-in for
+analyze_testcase.py.
+
+Usage:
+    python3 analysis_server.py [--socket PATH] [--memory 4096] [--no-cache]
+    python3 analysis_server.py --stop
+
+Protocol: one JSON request per line, one JSON response per line.
+    {"op": "analyze", "path": "/abs/testcase", "format": "json"|"summary", "fields": [...], "env": {...}}
+    {"op": "report", "path": "/abs/testcase" | "data": {...}, "output_dir": "/abs/dir", "env": {...}}
+    {"op": "ping"}  {"op": "shutdown"}
+Responses carry "ok": true, or "ok": false with "error". "env" holds the
+client's CLIENT_ENVIRONMENT values; when they differ from the server's the
+response also carries "local": true and the client analyzes in-process.
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+import time
+
+import analyze_testcase as analyzer
+from analyze_testcase import (analyze_testcase, configure_cache, configure_result_memory,
+                              load_bucket_owners, print_summary, project_fields)
+from generate_report import report_filename, write_report
+
+#########################################
+# Constants
+#########################################
+# Per-user socket in a directory only this user can enter ($XDG_RUNTIME_DIR,
+# else a 0700 directory under /tmp); set TESTCASE_ANALYSIS_SOCKET to relocate it
+SOCKET_DIR = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(tempfile.gettempdir(),
+                                                               f'testcase_analysis_{os.getuid()}')
+SOCKET_PATH = os.environ.get('TESTCASE_ANALYSIS_SOCKET', os.path.join(SOCKET_DIR, 'testcase_analysis.sock'))
+
+# Recent results kept in memory
+DEFAULT_RESULT_MEMORY = 4096
+
+# Largest request line accepted
+MAX_REQUEST_BYTES = 16 << 20
+
+# Environment the analysis depends on (Makefile $(TOP), bucket owners file);
+# keep in sync with analyze_client.CLIENT_ENVIRONMENT
+CLIENT_ENVIRONMENT = ('TOP', 'TESTCASE_BUCKET_OWNERS')
+
+
+#########################################
+# Request Handling
+#########################################
+
+def environment_mismatch(request):
+    """Response telling the client to run locally if its environment differs from ours, else None."""
+    client_env = request.get('env') or {}
+    differing = [name for name in CLIENT_ENVIRONMENT if client_env.get(name) != os.environ.get(name)]
+    if not differing:
+        return None
+    return {'ok': False, 'local': True,
+            'error': f"Client environment differs from the server's: {', '.join(differing)}"}
+
+
+def handle_analyze(request):
+    """Analyze one testcase; optionally render the human summary or project fields."""
+    mismatch = environment_mismatch(request)
+    if mismatch:
+        return mismatch
+    result = analyze_testcase(request['path'])
+    response = {'ok': True, 'result': project_fields(result, request.get('fields'))}
+    if request.get('format') == 'summary' and 'error' not in result:
+        text = io.StringIO()
+        print_summary(result, text)
+        response['text'] = text.getvalue()
+    return response
+
+
+def handle_report(request):
+    """Write an HTML report for a testcase (analyzed here) or for the given record."""
+    data = request.get('data')
+    if data is None:
+        mismatch = environment_mismatch(request)
+        if mismatch:
+            return mismatch
+        data = analyze_testcase(request['path'])
+        if 'error' in data:
+            return {'ok': False, 'error': data['error']}
+    output_dir = request.get('output_dir') or data.get('testcase_path') or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, report_filename(data))
+    write_report(data, output_file)
+    return {'ok': True, 'report': output_file}
+
+
+def handle_request(request, server):
+    """Dispatch one decoded request to its handler."""
+    op = request.get('op')
+    if op == 'analyze':
+        return handle_analyze(request)
+    if op == 'report':
+        return handle_report(request)
+    if op == 'ping':
+        return {'ok': True, 'pid': os.getpid(), 'uptime': round(time.time() - server.started, 1),
+                'requests': server.requests, 'cache_dir': analyzer.CACHE_DIR,
+                'results_in_memory': len(analyzer._recent_results)}
+    if op == 'shutdown':
+        server.stop_requested = True
+        return {'ok': True}
+    return {'ok': False, 'error': f'Unknown op: {op}'}
+
+
+class AnalysisRequestHandler(socketserver.StreamRequestHandler):
+    """Answer newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in iter(lambda: self.rfile.readline(MAX_REQUEST_BYTES), b''):
+            try:
+                request = json.loads(line)
+                response = handle_request(request, self.server)
+            except (KeyError, TypeError, ValueError) as e:
+                response = {'ok': False, 'error': f'Bad request: {type(e).__name__}: {e}'}
+            except Exception as e:
+                response = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+            self.server.requests += 1
+            self.wfile.write(json.dumps(response, separators=(',', ':'), default=str).encode() + b'\n')
+            self.wfile.flush()
+            if self.server.stop_requested:
+                # shutdown() waits for serve_forever(), which runs in another thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+#########################################
+# Server
+#########################################
+
+def is_trusted_socket(socket_path):
+    """
+    True if socket_path is a socket owned by this user in a directory other
+    users cannot replace it in (not group/other-writable, or sticky).
+    Keep in sync with analyze_client.is_trusted_socket.
+    """
+    try:
+        st = os.lstat(socket_path)
+        parent = os.stat(os.path.dirname(socket_path) or '.')
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+            and (not parent.st_mode & 0o022 or bool(parent.st_mode & stat.S_ISVTX)))
+
+
+def make_socket_dir(socket_path):
+    """Create the socket's directory (0700) if needed; raises OSError if another user controls it."""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() and not st.st_mode & stat.S_ISVTX:
+        raise OSError(f'Socket directory {directory} is owned by another user')
+    if st.st_mode & 0o022 and not st.st_mode & stat.S_ISVTX:
+        raise OSError(f'Socket directory {directory} is writable by other users')
+
+
+def send_request(request, socket_path=SOCKET_PATH, timeout=None):
+    """
+    Send one request to a running server and return its response (raises
+    OSError if none, or if the socket is not one this user can trust).
+    """
+    if os.path.exists(socket_path) and not is_trusted_socket(socket_path):
+        raise PermissionError(f'{socket_path} is not a socket owned by this user')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError('Analysis server closed the connection')
+    return json.loads(line)
+
+
+def remove_stale_socket(socket_path):
+    """
+    Remove a socket left behind by a dead server. Raises OSError if one is
+    still running, or if the path belongs to another user.
+    """
+    if not os.path.lexists(socket_path):
+        return
+    if not is_trusted_socket(socket_path):
+        raise OSError(f'{socket_path} exists and is not a socket owned by this user')
+    try:
+        send_request({'op': 'ping'}, socket_path, timeout=2)
+    except (OSError, ValueError):
+        os.unlink(socket_path)
+        return
+    raise OSError(f'An analysis server is already listening on {socket_path}')
+
+
+def serve(socket_path=SOCKET_PATH, memory=DEFAULT_RESULT_MEMORY):
+    """Warm the caches and serve requests until shutdown or Ctrl-C."""
+    make_socket_dir(socket_path)
+    remove_stale_socket(socket_path)
+    configure_result_memory(memory)
+    load_bucket_owners()
+
+    # Results are readable by the server's user only
+    old_umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, AnalysisRequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    server.started = time.time()
+    server.requests = 0
+    server.stop_requested = False
+    print(f"🟢 Analysis server {os.getpid()} listening on {socket_path}", file=sys.stderr)
+    try:
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    print("Analysis server stopped", file=sys.stderr)
+
+
+#########################################
+# MAIN
+#########################################
+def main():
+    parser = argparse.ArgumentParser(description="Serve testcase analysis from a warm, resident process.")
+    parser.add_argument('--socket', default=SOCKET_PATH, help=f'Unix socket path (default: {SOCKET_PATH})')
+    parser.add_argument('--memory', type=int, default=DEFAULT_RESULT_MEMORY,
+                        help=f'Recent results kept in memory (default: {DEFAULT_RESULT_MEMORY})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the on-disk analysis cache')
+    parser.add_argument('--status', action='store_true', help='Show the running server and exit')
+    parser.add_argument('--stop', action='store_true', help='Stop the running server and exit')
+    args = parser.parse_args()
+
+    if args.status or args.stop:
+        try:
+            response = send_request({'op': 'shutdown' if args.stop else 'ping'}, args.socket, timeout=5)
+        except (OSError, ValueError) as e:
+            print(f"❌ No analysis server on {args.socket}: {e}")
+            sys.exit(1)
+        print(json.dumps(response, indent=2))
+        return
+
+    if args.no_cache:
+        configure_cache(None)
+    try:
+        serve(args.socket, args.memory)
+    except OSError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
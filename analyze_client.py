@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Drop-in replacement for analyze_testcase.py that asks the resident
+analysis server (analysis_server.py) instead of analyzing in-process.
+
+Usage:
+    python3 analyze_client.py <testcase_path> [--json | --jsonl [-o out.jsonl] [--fields a,b]]
+    python3 analyze_client.py <testcase_path> --report [output_dir]
+
+Output and exit codes match analyze_testcase.py. When no server is
+running, when TOP or TESTCASE_BUCKET_OWNERS differ from the server's
+(or for --batch / --no-cache) the call falls through to
+analyze_testcase.py itself, and --report is generated in-process. This script deliberately imports nothing
+from the analyzer so each call only pays for a bare interpreter.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+
+# Keep in sync with analysis_server.SOCKET_PATH
+SOCKET_DIR = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(tempfile.gettempdir(),
+                                                               f'testcase_analysis_{os.getuid()}')
+SOCKET_PATH = os.environ.get('TESTCASE_ANALYSIS_SOCKET', os.path.join(SOCKET_DIR, 'testcase_analysis.sock'))
+
+# Environment the analysis depends on; keep in sync with analysis_server.CLIENT_ENVIRONMENT
+CLIENT_ENVIRONMENT = ('TOP', 'TESTCASE_BUCKET_OWNERS')
+
+# Options analyze_testcase.py understands that the server does not serve
+LOCAL_ONLY_OPTIONS = {'--batch', '--no-cache', '--workers', '--threads', '--gzip', '-h', '--help'}
+
+
+def is_trusted_socket(socket_path):
+    """
+    True if socket_path is a socket owned by this user in a directory other
+    users cannot replace it in. Keep in sync with analysis_server.is_trusted_socket.
+    """
+    try:
+        st = os.lstat(socket_path)
+        parent = os.stat(os.path.dirname(socket_path) or '.')
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+            and (not parent.st_mode & 0o022 or bool(parent.st_mode & stat.S_ISVTX)))
+
+
+def send_request(request):
+    """
+    Send one request to the server; returns the response or None if no
+    server answers. A socket this user does not own is never trusted.
+    """
+    if not is_trusted_socket(SOCKET_PATH):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(SOCKET_PATH)
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            with sock.makefile('rb') as f:
+                line = f.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def run_locally(argv):
+    """Replace this process with analyze_testcase.py (same arguments)."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analyze_testcase.py')
+    os.execv(sys.executable, [sys.executable, script, *argv])
+
+
+def write_report_locally(path, output_dir):
+    """Analyze and write the report in-process (no server running); returns a server-style response."""
+    from analyze_testcase import analyze_testcase
+    from generate_report import report_filename, write_report
+    data = analyze_testcase(path)
+    if 'error' in data:
+        return {'ok': False, 'error': data['error']}
+    output_dir = output_dir or path
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, report_filename(data))
+    write_report(data, output_file)
+    return {'ok': True, 'report': output_file}
+
+
+def parse_args(argv):
+    """
+    Parse the served subset of the analyze_testcase.py options plus
+    --report [output_dir]. Returns None when the call should run locally.
+    """
+    args = {'path': None, 'json': False, 'jsonl': False, 'output': None, 'fields': None, 'report': None}
+    items = list(argv)
+    while items:
+        item = items.pop(0)
+        option, _, value = item.partition('=')
+        if option in LOCAL_ONLY_OPTIONS:
+            return None
+        if option in ('--json', '--jsonl'):
+            args[option[2:]] = True
+        elif option in ('--output', '-o', '--fields'):
+            if not value and not items:
+                return None
+            args['fields' if option == '--fields' else 'output'] = value or items.pop(0)
+        elif option == '--report':
+            # Optional directory argument, once the testcase path is known
+            if not value and args['path'] is not None and items and not items[0].startswith('-'):
+                value = items.pop(0)
+            args['report'] = value
+        elif item.startswith('-') or args['path'] is not None:
+            return None
+        else:
+            args['path'] = item
+    if args['path'] is None or (args['output'] or '').endswith('.gz'):
+        return None
+    return args
+
+
+def main():
+    argv = sys.argv[1:]
+    args = parse_args(argv)
+    if args is None:
+        if any(item.partition('=')[0] == '--report' for item in argv):
+            print("Usage: python3 analyze_client.py <testcase_path> --report [output_dir]")
+            sys.exit(1)
+        run_locally(argv)
+    path = os.path.abspath(args['path'])
+    env = {name: os.environ.get(name) for name in CLIENT_ENVIRONMENT}
+
+    if args['report'] is not None:
+        output_dir = os.path.abspath(args['report']) if args['report'] else None
+        response = send_request({'op': 'report', 'path': path, 'output_dir': output_dir, 'env': env})
+        if response is None or response.get('local'):
+            response = write_report_locally(path, output_dir)
+        if not response['ok']:
+            print(f"❌ ERROR: {response['error']}")
+            sys.exit(1)
+        print(f"✅ Report generated: {response['report']}")
+        return
+
+    fields = [f.strip() for f in args['fields'].split(',') if f.strip()] if args['fields'] else None
+    request = {'op': 'analyze', 'path': path,
+               'format': 'summary' if not (args['json'] or args['jsonl']) else 'json',
+               'fields': fields if args['jsonl'] else None, 'env': env}
+    response = send_request(request)
+    if response is None or not response['ok']:
+        run_locally(argv)
+    result = response['result']
+
+    if args['jsonl']:
+        out = open(args['output'], 'w', encoding='utf-8') if args['output'] not in (None, '-') else sys.stdout
+        out.write(json.dumps(result, separators=(',', ':'), default=str) + '\n')
+        if out is not sys.stdout:
+            out.close()
+        sys.exit(1 if 'error' in result else 0)
+
+    if 'error' in result:
+        print(f"❌ ERROR: {result['error']}")
+        sys.exit(1)
+
+    if args['json']:
+        print(json.dumps(result, indent=2, default=str))
+    else:
+        sys.stdout.write(response['text'])
+        print("\nFor JSON output, use: --json flag")
+
+
+if __name__ == "__main__":
+    main()
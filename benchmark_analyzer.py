@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Benchmark the triage tooling on synthetic release trees.
+
+Generates a realistic etautotest tree in a temp directory (buckets, shared
+Makefile includes, PASSED / Exit status / Diff in / Core Dump /
+multi-failure test.out files, large test.log files, long testcase.history
+and runtime_statistics, many *.diff.bak files, a bucket_owners file), then
+times every extractor per testcase, full --batch sweeps with a cold and
+a warm analysis cache, and an uncached two-tier (default --batch) sweep.
+
+Usage:
+    python3 benchmark_analyzer.py [--sizes 1000,10000,50000] [--json | -o bench.json]
+    python3 benchmark_analyzer.py --sizes 1000 --compare baseline.json --tolerance 0.25
+    python3 benchmark_analyzer.py --generate /tmp/synthetic --sizes 5000
+
+With --compare, exits 1 when a timing is more than --tolerance slower
+than the same size in the baseline file (a previous --json run).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import analyze_testcase as analyzer
+from analyze_testcase import (analyze_release, analyze_testcase, configure_cache, discover_testcases,
+                              find_diff_bak_files, get_bucket_owner, load_bucket_owners, parse_runtime_statistics,
+                              parse_test_log, parse_test_out, parse_testcase_history, scan_testcase)
+from generate_report import generate_html
+
+#########################################
+# Constants
+#########################################
+DEFAULT_SIZES = [1000, 10000, 50000]
+TESTCASES_PER_BUCKET = 200
+EXTRACTOR_SAMPLE = 500          # testcases timed per extractor
+SEED = 261
+
+# test.out variants and their share of the tree
+TEST_OUT_VARIANTS = [('passed', 0.60), ('exit_status', 0.10), ('diff_in', 0.10), ('core_dump', 0.05),
+                     ('multi_failure', 0.10), ('diff_bak_only', 0.05)]
+
+COMMANDS = ['build_model', 'build_testmode', 'verify_test_structures', 'create_logic_tests',
+            'write_vectors', 'analyze_faults', 'simulate_vectors', 'report_test_structures']
+ENGINEERS = ['jdoe', 'asmith', 'bkumar', 'lchen', 'mgarcia', 'pnovak']
+HISTORY_BUILDS = 150
+RUNTIME_ROWS = 150
+LOG_LINES = 100                 # test.log / command log lines
+LARGE_LOG_LINES = 50000         # ~4.5 MB test.log ...
+LARGE_LOG_SHARE = 0.01          # ... for this share of testcases
+LOG_LINE = 'INFO (TDA-001): Processed {0} of 100000 faults, {1} patterns, elapsed {2}s  [end TDA_001]\n'
+
+# Timings --compare checks: (section, key) pairs under each size
+COMPARED_TIMINGS = [('extractors', name) for name in
+                    ['parse_test_out', 'parse_test_log', 'find_diff_bak_files', 'get_bucket_owner',
+                     'parse_testcase_history', 'parse_runtime_statistics', 'analyze_testcase', 'generate_html']]
+COMPARED_TIMINGS += [('sweeps', 'cold'), ('sweeps', 'warm'), ('sweeps', 'tiered')]
+
+
+#########################################
+# Synthetic Tree
+#########################################
+
+def write_file(path, content):
+    """Write a text file, creating its directory."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def makefile_root(commands):
+    """Shared Makefile include in the layout of etautotest/tools/Makefile_root."""
+    rules = ['GLOBAL_NEWCMD_OPTIONS = log=no', 'OUTDIR = .', 'all: $(TEST_TARGETS) $(VERIFY_TARGETS)']
+    for command in commands:
+        upper = command.upper()
+        rules.append(f'{command}:\n'
+                     f'\t-{command} $(GLOBAL_NEWCMD_OPTIONS) $(LOCAL_{upper}_OPTIONS) '
+                     f'> $(OUTDIR)/testresults/logs/log_{command} 2>&1 ; \\\n'
+                     f'\tsh -c "echo EXIT STATUS for {command} is $$? " >> $(OUTDIR)/status.log')
+        rules.append(f'{command}_diff:\n'
+                     f'\t@cdsDiff.pl golds/log_{command} testresults/logs/log_{command} > {command}.diff')
+    rules.append('status_diff:\n\t@cdsDiff.pl golds/status.log status.log > status.diff')
+    return '\n'.join(rules) + '\n'
+
+
+def history_text(rng, builds):
+    """testcase.history with builds rows, mostly PASSED with occasional failures and regolds."""
+    lines = ['# Format: Build Status SimStatus GoldBuild Notes']
+    gold = '21.10.Jan01'
+    for i in range(builds):
+        build = f'21.{10 + i // 300}.b{i:04d}'
+        status = rng.choices(['PASSED', 'FAILED', 'NOT-RUN'], [0.85, 0.12, 0.03])[0]
+        notes = ''
+        if status == 'FAILED' and rng.random() < 0.3:
+            notes = f'CCR {1000000 + rng.randrange(900000)}'
+        elif rng.random() < 0.02:
+            gold, notes = build, 'PASSED AFTER REGOLD'
+        lines.append(f'{build}  {status}  NA  {gold}  {notes}'.rstrip())
+    return '\n'.join(lines) + '\n'
+
+
+def runtime_text(rng, rows):
+    """runtime_statistics with rows builds of runtimes and disk sizes."""
+    lines = ['      Build  Status  MODUS Runtime  Simulation Runtime  Total Runtime  '
+             'tbdata size (MB)  testresults size (MB)  Testcase size (MB)']
+    base = rng.randrange(30, 3600)
+    for i in range(rows):
+        modus = int(base * rng.uniform(0.9, 1.2))
+        total = modus + rng.randrange(5, 60)
+        status = rng.choices(['PASSED', 'FAILED'], [0.9, 0.1])[0]
+        lines.append(f'21.10-s{i:03d},b{i:04d}  {status}  {time.strftime("%H:%M:%S", time.gmtime(modus))}  NA  '
+                     f'{time.strftime("%H:%M:%S", time.gmtime(total))}  {rng.uniform(1, 500):.1f}  '
+                     f'{rng.uniform(1, 50):.1f}  {rng.uniform(5, 600):.1f}')
+    return '\n'.join(lines) + '\n'
+
+
+def log_text(rng, lines, status_line):
+    """A command log / test.log body of lines lines ending in status_line."""
+    body = ''.join(LOG_LINE.format(i, rng.randrange(10000), i // 10) for i in range(lines))
+    return body + status_line + '\n'
+
+
+def test_out_text(variant, rng, commands, diff_files):
+    """test.out for one of TEST_OUT_VARIANTS."""
+    header = 'Cadence Modus Version 21.10-s002, built Mar 25 2021 (lnx86)\n'
+    command = rng.choice(commands)
+    engineer = rng.choice(ENGINEERS)
+    if variant == 'passed':
+        return header + 'PASSED\n'
+    if variant == 'exit_status':
+        body = f'Exit status diff by {command} ({command}) (RD engineer: {engineer})\n'
+    elif variant == 'diff_in':
+        body = f'Diff in {command} ({command}) (RD engineer: {engineer})\n'
+    elif variant == 'core_dump':
+        body = f'Core Dump core.{rng.randrange(1000, 99999)} in {command} ({command}) (RD engineer: {engineer})\n'
+    elif variant == 'multi_failure':
+        body = ''.join(f'{reason} {word} {cmd} ({cmd}) (RD engineer: {rng.choice(ENGINEERS)})\n'
+                       for reason, word, cmd in [('Sev Warning diff', 'in', command),
+                                                 ('Warning diff', 'in', rng.choice(commands)),
+                                                 ('Diff', 'in', rng.choice(commands))])
+    else:
+        body = ''.join(f'{name}: differences found\n' for name in diff_files[:3])
+    return header + body + 'Failed\n'
+
+
+def generate_testcase(path, rng, variant, commands, log_lines, large_log_lines):
+    """Write one synthetic testcase directory."""
+    command_targets = ' '.join(commands)
+    verify_targets = ' '.join(f'{c}_diff' for c in commands)
+    files = {
+        'Makefile': (f'TEST_TARGETS = {command_targets}\nVERIFY_TARGETS = status_diff {verify_targets}\n'
+                     f'LOCAL_BUILD_MODEL_OPTIONS = cell=TOP\ninclude ../../../tools/Makefile_root\n'),
+        'testcase.history': history_text(rng, HISTORY_BUILDS),
+        'runtime_statistics': runtime_text(rng, RUNTIME_ROWS),
+    }
+    diff_files = []
+    if variant != 'passed':
+        diff_files = [f'{rng.choice(commands)}_{i}.diff.bak' for i in range(rng.randrange(1, 40))]
+        for name in diff_files:
+            files[name] = f'12c12\n< Faults tested {rng.randrange(10000)}\n---\n> Faults tested {rng.randrange(10000)}\n'
+        failed = commands[-1]
+        files['status.log'] = ''.join(f'EXIT STATUS for {c} is {5 if c == failed else 0}\n' for c in commands)
+        files['golds.linux26_64/status.log'] = ''.join(f'EXIT STATUS for {c} is 0\n' for c in commands)
+        files[f'golds.linux26_64/log_{failed}'] = log_text(random.Random(1), log_lines, 'done')
+        files[f'testresults/logs/log_{failed}'] = log_text(random.Random(2), log_lines, 'done')
+    if variant == 'core_dump':
+        files['core.12345'] = ''
+
+    files['test.out'] = test_out_text(variant, rng, commands, diff_files)
+    status_line = 'Testcase passed' if variant == 'passed' else 'Testcase Failed'
+    lines = large_log_lines if rng.random() < LARGE_LOG_SHARE else log_lines
+    files['test.log'] = log_text(rng, lines, status_line)
+    for name, content in files.items():
+        write_file(os.path.join(path, name), content)
+
+
+def generate_tree(root, count, seed=SEED, log_lines=LOG_LINES, large_log_lines=LARGE_LOG_LINES):
+    """
+    Generate a synthetic release with count testcases under root/etautotest
+    plus root/bucket_owners. Returns the etautotest directory.
+    """
+    rng = random.Random(seed)
+    etautotest = os.path.join(root, 'etautotest')
+    write_file(os.path.join(etautotest, 'tools', 'Makefile_root'), makefile_root(COMMANDS))
+    variants, weights = zip(*TEST_OUT_VARIANTS)
+    buckets = []
+    for index in range(count):
+        bucket = f'bucket{index // TESTCASES_PER_BUCKET:03d}/group{index % 4}'
+        if not buckets or buckets[-1] != bucket:
+            buckets.append(bucket)
+        commands = rng.sample(COMMANDS, rng.randrange(2, len(COMMANDS)))
+        generate_testcase(os.path.join(etautotest, bucket, f'tc{index:06d}'), rng,
+                          rng.choices(variants, weights)[0], commands, log_lines, large_log_lines)
+
+    # Real owners files are long; pad with unrelated buckets
+    owners = [f'other/area{i}/sub|{rng.choice(ENGINEERS)},{rng.choice(ENGINEERS)}' for i in range(3000)]
+    owners += [f'{bucket}|{rng.choice(ENGINEERS)},{rng.choice(ENGINEERS)}' for bucket in buckets]
+    rng.shuffle(owners)
+    write_file(os.path.join(root, 'bucket_owners'), '\n'.join(owners) + '\n')
+    return etautotest
+
+
+#########################################
+# Timing
+#########################################
+
+@contextmanager
+def analyzer_settings(cache_dir, bucket_owners=None):
+    """
+    Point the analyzer at cache_dir (None disables caching) and, if given,
+    another bucket_owners file (also exported as TESTCASE_BUCKET_OWNERS for
+    pool workers); the caller's settings are restored afterwards.
+    """
+    old_cache_dir = analyzer.CACHE_DIR
+    old_owners_file = analyzer.BUCKET_OWNERS_FILE
+    old_owners_env = os.environ.get('TESTCASE_BUCKET_OWNERS')
+    configure_cache(cache_dir)
+    if bucket_owners:
+        analyzer.BUCKET_OWNERS_FILE = os.environ['TESTCASE_BUCKET_OWNERS'] = bucket_owners
+    try:
+        yield
+    finally:
+        configure_cache(old_cache_dir)
+        analyzer.BUCKET_OWNERS_FILE = old_owners_file
+        if old_owners_env is None:
+            os.environ.pop('TESTCASE_BUCKET_OWNERS', None)
+        else:
+            os.environ['TESTCASE_BUCKET_OWNERS'] = old_owners_env
+
+
+def summarize_times(samples):
+    """Totals and percentiles (in ms) for a list of per-call seconds."""
+    if not samples:
+        return {'calls': 0}
+    ordered = sorted(samples)
+    return {
+        'calls': len(ordered),
+        'total_s': round(sum(ordered), 4),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def time_calls(fn, items):
+    """Call fn(item) for every item; returns the per-call seconds."""
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def benchmark_extractors(testcases):
+    """
+    Time each extractor, a full analysis and generate_html over the
+    testcases, all uncached (nothing is read from or written to the cache).
+    """
+    snapshots = {testcase: scan_testcase(testcase) for testcase in testcases}
+    load_bucket_owners()
+    with analyzer_settings(None):
+        timings = {
+            'parse_test_out': time_calls(lambda t: parse_test_out(t, None, snapshots[t]), testcases),
+            'parse_test_log': time_calls(lambda t: parse_test_log(t, snapshots[t]), testcases),
+            'find_diff_bak_files': time_calls(lambda t: find_diff_bak_files(t, snapshots[t]), testcases),
+            'get_bucket_owner': time_calls(get_bucket_owner, testcases),
+            'parse_testcase_history': time_calls(lambda t: parse_testcase_history(t, snapshots[t]), testcases),
+            'parse_runtime_statistics': time_calls(lambda t: parse_runtime_statistics(t, snapshots[t]), testcases),
+        }
+        results = []
+        timings['analyze_testcase'] = time_calls(lambda t: results.append(analyze_testcase(t)), testcases)
+    timings['generate_html'] = time_calls(generate_html, results)
+    return {name: summarize_times(samples) for name, samples in timings.items()}
+
+
+def benchmark_sweep(etautotest, workers=None, threads=False, tiered=False):
+    """Time one analyze_release() sweep. Returns wall time, rate and status counts."""
+    statuses = {}
+    start = time.perf_counter()
+    for result in analyze_release(etautotest, workers=workers, threads=threads, tiered=tiered):
+        status = 'error' if 'error' in result else result['status']
+        statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - start
+    count = sum(statuses.values())
+    return {'wall_s': round(elapsed, 3), 'testcases_per_s': round(count / elapsed, 1) if elapsed else None,
+            'statuses': statuses}
+
+
+def benchmark_size(work_dir, count, workers=None, threads=False, sample=EXTRACTOR_SAMPLE):
+    """Generate a tree of count testcases in work_dir and run every benchmark on it."""
+    start = time.perf_counter()
+    etautotest = generate_tree(work_dir, count)
+    generate_s = time.perf_counter() - start
+
+    bucket_owners = os.path.join(work_dir, 'bucket_owners')
+    testcases = list(discover_testcases(etautotest))
+    step = max(1, len(testcases) // sample)
+    with analyzer_settings(None, bucket_owners):
+        extractors = benchmark_extractors(testcases[::step][:sample])
+
+    # Uncached two-tier sweep, then a cold sweep filling a fresh cache and a
+    # warm sweep answering from it
+    with analyzer_settings(None, bucket_owners):
+        sweeps = {'tiered': benchmark_sweep(etautotest, workers, threads, tiered=True)}
+    with analyzer_settings(os.path.join(work_dir, 'cache'), bucket_owners):
+        sweeps['cold'] = benchmark_sweep(etautotest, workers, threads)
+        sweeps['warm'] = benchmark_sweep(etautotest, workers, threads)
+    return {'testcases': len(testcases), 'generate_s': round(generate_s, 2),
+            'extractors': extractors, 'sweeps': sweeps}
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return the timings more than tolerance slower than the baseline's same size."""
+    previous = {entry['testcases']: entry for entry in baseline.get('sizes', [])}
+    regressions = []
+    for entry in results['sizes']:
+        old = previous.get(entry['testcases'])
+        if not old:
+            continue
+        for section, name in COMPARED_TIMINGS:
+            key = 'wall_s' if section == 'sweeps' else 'p50_ms'
+            before = old.get(section, {}).get(name, {}).get(key)
+            after = entry[section].get(name, {}).get(key)
+            if before and after and after > before * (1 + tolerance):
+                regressions.append({'testcases': entry['testcases'], 'timing': f'{section}.{name}.{key}',
+                                    'baseline': before, 'current': after, 'ratio': round(after / before, 2)})
+    return regressions
+
+
+#########################################
+# Output
+#########################################
+
+def print_results(results):
+    """Print the benchmark results as tables."""
+    print("=" * 90)
+    print(f"ANALYZER BENCHMARK  python {results['python']}  {results['cpu_count']} CPUs  "
+          f"workers={results['workers'] or 'default'}{' (threads)' if results['threads'] else ''}")
+    print("=" * 90)
+    for entry in results['sizes']:
+        print(f"\n{entry['testcases']} testcases (generated in {entry['generate_s']}s)")
+        print(f"  {'Extractor':<26} {'Calls':>6} {'Mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'Max ms':>9}")
+        for name, timing in entry['extractors'].items():
+            print(f"  {name:<26} {timing['calls']:>6} {timing['mean_ms']:>9} {timing['p50_ms']:>9} "
+                  f"{timing['p95_ms']:>9} {timing['max_ms']:>9}")
+        for name, sweep in entry['sweeps'].items():
+            label = 'two-tier, no cache' if name == 'tiered' else f'{name} cache'
+            print(f"  Sweep ({label}): {sweep['wall_s']}s, {sweep['testcases_per_s']} testcases/s")
+    for regression in results.get('regressions', []):
+        print(f"⚠️  {regression['testcases']} testcases: {regression['timing']} "
+              f"{regression['baseline']} -> {regression['current']} (x{regression['ratio']})")
+
+
+#########################################
+# MAIN
+#########################################
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analyzer and report generator on synthetic trees.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated tree sizes in testcases (default: 1000,10000,50000)')
+    parser.add_argument('--workers', type=int, default=None, help='Sweep workers (default: CPU count)')
+    parser.add_argument('--threads', action='store_true', help='Sweep with a thread pool instead of processes')
+    parser.add_argument('--sample', type=int, default=EXTRACTOR_SAMPLE,
+                        help=f'Testcases timed per extractor (default: {EXTRACTOR_SAMPLE})')
+    parser.add_argument('--json', action='store_true', help='Output machine-readable JSON')
+    parser.add_argument('--output', '-o', default=None, help='Also write the JSON results to this file')
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help='Previous --json output; exit 1 on timings slower than --tolerance')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown against --compare (default: 0.25)')
+    parser.add_argument('--work-dir', default=None, help='Generate trees here instead of a temp directory')
+    parser.add_argument('--generate', default=None, metavar='DIR',
+                        help='Only generate a tree of the first --sizes testcases in DIR and exit')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    if args.generate:
+        print(generate_tree(args.generate, sizes[0]))
+        return
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ ERROR: Cannot read baseline {args.compare}: {e}")
+            sys.exit(1)
+
+    results = {'timestamp': datetime.now().isoformat(), 'python': platform.python_version(),
+               'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+               'workers': args.workers, 'threads': args.threads, 'sizes': []}
+    base_dir = tempfile.mkdtemp(prefix='analyzer_bench_', dir=args.work_dir)
+    try:
+        for size in sizes:
+            print(f"⏱️  Benchmarking {size} testcases ...", file=sys.stderr)
+            work_dir = os.path.join(base_dir, str(size))
+            results['sizes'].append(benchmark_size(work_dir, size, args.workers, args.threads, args.sample))
+            shutil.rmtree(work_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+    if baseline:
+        results['regressions'] = compare_to_baseline(results, baseline, args.tolerance)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.json and not args.output:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+    if results.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Cluster failing testcases of a release by failure signature.
+
+Each failing testcase is reduced to its failing_command plus the first hunk
+of its first *.diff.bak file (in the analyzer's priority order), with
+numbers, paths, timestamps and versions masked. Identical signatures are
+grouped through a hash index; clusters whose signatures are near-duplicates
+(same failing command, MinHash/LSH estimated similarity >= --threshold) are
+then merged. Triage one representative per cluster.
+
+Usage:
+    python3 cluster_failures.py <dir|records.jsonl[.gz]|-> [--json] [-o clusters.json]
+
+Records come from analyze_testcase.py --batch --jsonl (diff_bak_files,
+failing_command and testcase_path must be present).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+from collections import defaultdict
+
+from generate_report import NON_FAILING_STATUSES, iter_records
+
+#########################################
+# Constants
+#########################################
+# Stop reading a diff.bak hunk after this many lines
+MAX_HUNK_LINES = 200
+
+# MinHash: NUM_PERM = LSH_BANDS * LSH_ROWS
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = 4
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5eed)
+MINHASH_PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+                        for _ in range(NUM_PERM)]
+
+HUNK_HEADER_RE = re.compile(r'^\d+(,\d+)?[acd]\d+(,\d+)?\s*$')
+
+# Applied in order: the more specific masks must run before <N>
+MASKS = [
+    (re.compile(r'\b\d{4}[-/]\d{2}[-/]\d{2}([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?\b'), '<TIME>'),
+    (re.compile(r'\b(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\w*\s+\w{3}\s+\d{1,2}\b', re.I), '<TIME>'),
+    (re.compile(r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+\d{1,2},?\s+\d{4}\b', re.I), '<TIME>'),
+    (re.compile(r'\b\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?\b'), '<TIME>'),
+    (re.compile(r'\b[vV]?\d+\.\d+(\.\d+)*([-_][a-zA-Z]*\d+)*\b'), '<VER>'),
+    (re.compile(r'(?<![\w.])(~|\.{1,2})?/[^\s:;,\'"()]+'), '<PATH>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '<HEX>'),
+    (re.compile(r'\d+'), '<N>'),
+]
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+#########################################
+# Signature Extraction
+#########################################
+
+def normalize_line(line):
+    """Mask volatile tokens (timestamps, versions, paths, hex, numbers) in a line."""
+    for pattern, token in MASKS:
+        line = pattern.sub(token, line)
+    return WHITESPACE_RE.sub(' ', line).strip()
+
+
+def read_first_hunk(path):
+    """Return the changed lines of the first hunk in a diff.bak file ([] if unreadable)."""
+    lines = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if HUNK_HEADER_RE.match(line):
+                    if lines:
+                        break
+                    continue
+                if line.startswith(('<', '>')):
+                    lines.append(line)
+                    if len(lines) >= MAX_HUNK_LINES:
+                        break
+    except OSError:
+        pass
+    return lines
+
+
+def failure_signature(record):
+    """
+    Build the normalized signature text for a failing record.
+    Returns (signature_hash, signature_text).
+    """
+    command = record.get('failing_command') or 'Unknown'
+    hunk = []
+    diff_files = record.get('diff_bak_files') or []
+    if diff_files and record.get('testcase_path'):
+        hunk = read_first_hunk(os.path.join(record['testcase_path'], diff_files[0]))
+        hunk = [normalize_line(line) for line in hunk]
+        hunk.insert(0, diff_files[0])
+    text = '\n'.join([normalize_line(command)] + hunk)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16], text
+
+
+#########################################
+# MinHash / LSH
+#########################################
+
+def shingles(text):
+    """Word shingles of the signature text (the whole text if it is short)."""
+    words = text.split()
+    if len(words) <= SHINGLE_SIZE:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM ints) of the text's shingle set."""
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big')
+              for s in shingles(text)]
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in MINHASH_PERMUTATIONS]
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def find_root(parents, item):
+    """Union-find lookup with path halving."""
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+
+def merge_near_duplicates(groups, threshold=DEFAULT_THRESHOLD):
+    """
+    Merge exact-signature groups whose signatures are near-duplicates.
+    groups: {signature_hash: {'command': ..., 'text': ..., ...}}
+    Returns {signature_hash: root_signature_hash}.
+    """
+    parents = {key: key for key in groups}
+    minhashes = {key: minhash(group['text']) for key, group in groups.items()}
+    buckets = defaultdict(list)
+    for key in sorted(groups):
+        sig = minhashes[key]
+        for band in range(LSH_BANDS):
+            rows = tuple(sig[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            buckets[(groups[key]['command'], band, rows)].append(key)
+
+    # Every pair sharing a band is a candidate; pairs seen in an earlier band are not re-estimated
+    compared = set()
+    for candidates in buckets.values():
+        for i, first in enumerate(candidates):
+            for other in candidates[i + 1:]:
+                root_a, root_b = find_root(parents, first), find_root(parents, other)
+                if root_a == root_b or (first, other) in compared:
+                    continue
+                compared.add((first, other))
+                if estimate_similarity(minhashes[first], minhashes[other]) >= threshold:
+                    parents[max(root_a, root_b)] = min(root_a, root_b)
+    return {key: find_root(parents, key) for key in groups}
+
+
+#########################################
+# Clustering
+#########################################
+
+def cluster_records(records, threshold=DEFAULT_THRESHOLD, near_duplicates=True):
+    """
+    Cluster failing records by signature.
+    Returns a list of cluster dicts, largest first.
+    """
+    groups = {}
+    for record in records:
+        if not isinstance(record, dict) or 'error' in record or record.get('status') in NON_FAILING_STATUSES:
+            continue
+        key, text = failure_signature(record)
+        group = groups.setdefault(key, {'command': record.get('failing_command') or 'Unknown',
+                                        'text': text, 'members': []})
+        # Keep only what the cluster report needs, not the whole record
+        group['members'].append({'testcase_path': record.get('testcase_path', ''),
+                                 'bucket': record.get('bucket', 'Unknown'),
+                                 'failure_reason': record.get('failure_reason', 'Unknown')})
+
+    roots = merge_near_duplicates(groups, threshold) if near_duplicates else {key: key for key in groups}
+    merged = defaultdict(list)
+    for key in sorted(groups):
+        merged[roots[key]].append(key)
+
+    clusters = []
+    for root, keys in merged.items():
+        members = sorted((m for key in keys for m in groups[key]['members']),
+                         key=lambda m: m['testcase_path'])
+        representative = members[0]
+        clusters.append({
+            'signature': root,
+            'size': len(members),
+            'failing_command': groups[root]['command'],
+            'failure_reason': representative['failure_reason'],
+            'representative': representative['testcase_path'],
+            'signature_text': groups[root]['text'],
+            'merged_signatures': keys,
+            'buckets': sorted({m['bucket'] for m in members}),
+            'testcases': [m['testcase_path'] for m in members],
+        })
+    clusters.sort(key=lambda c: (-c['size'], c['signature']))
+    return clusters
+
+
+def print_clusters(clusters, out=sys.stdout, max_members=5):
+    """Print a human readable cluster summary."""
+    failures = sum(c['size'] for c in clusters)
+    print("=" * 80, file=out)
+    print(f"FAILURE CLUSTERS: {failures} failing testcases in {len(clusters)} clusters", file=out)
+    print("=" * 80, file=out)
+    for index, cluster in enumerate(clusters, 1):
+        print(f"\n[{index}] {cluster['size']} testcase(s)  command={cluster['failing_command']}  "
+              f"reason={cluster['failure_reason']}  signature={cluster['signature']}", file=out)
+        print(f"  Representative: {cluster['representative']}", file=out)
+        print(f"  Buckets: {', '.join(cluster['buckets'])}", file=out)
+        for line in cluster['signature_text'].splitlines()[1:4]:
+            print(f"    {line}", file=out)
+        others = cluster['testcases'][1:]
+        for path in others[:max_members]:
+            print(f"  - {path}", file=out)
+        if len(others) > max_members:
+            print(f"  ... and {len(others) - max_members} more", file=out)
+
+
+#########################################
+# MAIN
+#########################################
+def main():
+    parser = argparse.ArgumentParser(description="Cluster failing testcases by normalized failure signature.")
+    parser.add_argument('source', help='Directory of JSON/JSONL files, a JSONL[.gz] file, or - for stdin')
+    parser.add_argument('--json', action='store_true', help='Output clusters as JSON')
+    parser.add_argument('--output', '-o', default=None, help='Write output to this file instead of stdout')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Near-duplicate similarity threshold (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--exact', action='store_true', help='Only group identical signatures (no MinHash/LSH)')
+    args = parser.parse_args()
+
+    try:
+        clusters = cluster_records(iter_records(args.source), args.threshold, not args.exact)
+    except (OSError, ValueError) as e:
+        print(f"Error reading records: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        if args.json:
+            json.dump(clusters, out, indent=2)
+            out.write('\n')
+        else:
+            print_clusters(clusters, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Compare the testcase results of two releases.
+
+Walks two etautotest roots in step, matches testcases by their path
+relative to the root (bucket/.../testcase) and reports what changed:
+status transitions (Pass->Fail, Fail->Pass, ...), new and removed
+testcases, and failures whose failure_reason or failing_command changed.
+
+Usage:
+    python3 compare_releases.py <old_root> <new_root> [--workers N] [--jsonl -o delta.jsonl]
+    python3 compare_releases.py /lan/fed/etpv/release/252/lnx86/etautotest /lan/fed/etpv/release/261/lnx86/etautotest
+
+Both sides go through analyze_testcase(), so results already in the
+analysis cache are reused. The two directory walks are merged as sorted
+streams and each pair is reduced to a small delta record in the worker,
+so memory stays flat for full release trees.
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import analyze_testcase as analyzer
+from analyze_testcase import (analyze_testcase_safe, configure_cache, discover_testcases,
+                              open_jsonl_output, run_bounded, write_jsonl_record)
+from generate_report import NON_FAILING_STATUSES
+
+# Fields compared between the two releases
+COMPARED_FIELDS = ['status', 'failure_reason', 'failing_command']
+
+
+#########################################
+# Matching
+#########################################
+
+def relative_testcases(root):
+    """Yield (sort key, relative path, absolute path) for the testcases under root, in walk order."""
+    root = os.path.abspath(root)
+    for path in discover_testcases(root):
+        relative = os.path.relpath(path, root)
+        # discover_testcases walks sorted directory names, i.e. path components in order
+        yield relative.split(os.sep), relative, path
+
+
+def merge_releases(old_root, new_root):
+    """
+    Merge-join the two sorted testcase walks.
+    Yields (relative path, old path or None, new path or None).
+    """
+    old_walk = relative_testcases(old_root)
+    new_walk = relative_testcases(new_root)
+    old = next(old_walk, None)
+    new = next(new_walk, None)
+    while old or new:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield old[1], old[2], None
+            old = next(old_walk, None)
+        elif old is None or new[0] < old[0]:
+            yield new[1], None, new[2]
+            new = next(new_walk, None)
+        else:
+            yield old[1], old[2], new[2]
+            old = next(old_walk, None)
+            new = next(new_walk, None)
+
+
+#########################################
+# Comparison
+#########################################
+
+def summarize_side(result):
+    """Reduce an analysis result to the compared fields (None for a missing side)."""
+    if result is None:
+        return None
+    if 'error' in result:
+        return {'error': result['error']}
+    return {field: result.get(field) for field in COMPARED_FIELDS}
+
+
+def classify_delta(old, new):
+    """Return (transition, changed fields) for two summarized sides."""
+    if old is None:
+        return 'new', []
+    if new is None:
+        return 'removed', []
+    if 'error' in old or 'error' in new:
+        return 'error', []
+    changes = [field for field in COMPARED_FIELDS if old[field] != new[field]]
+    if 'status' in changes:
+        return f"{old['status']}->{new['status']}", changes
+    if changes and new['status'] not in NON_FAILING_STATUSES:
+        return 'changed', changes
+    return 'same', []
+
+
+def compare_pair(item):
+    """Analyze both sides of a matched testcase and return its delta record."""
+    relative, old_path, new_path = item
+    # Only the compared fields are needed, so clean passes stop at tier 1
+    old = summarize_side(analyze_testcase_safe(old_path, tiered=True) if old_path else None)
+    new = summarize_side(analyze_testcase_safe(new_path, tiered=True) if new_path else None)
+    transition, changes = classify_delta(old, new)
+    return {
+        'testcase': relative,
+        'bucket': relative.split(os.sep)[0],
+        'transition': transition,
+        'changes': changes,
+        'old': old,
+        'new': new,
+        'old_path': old_path,
+        'new_path': new_path,
+    }
+
+
+def compare_releases(old_root, new_root, workers=None, threads=False):
+    """
+    Compare every testcase of two release roots over a process pool (or a
+    thread pool with threads=True). Yields delta records as they finish.
+    """
+    pairs = merge_releases(old_root, new_root)
+    if threads:
+        workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        executor = ThreadPoolExecutor(max_workers=workers)
+    else:
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=configure_cache,
+                                       initargs=(analyzer.CACHE_DIR,))
+    with executor:
+        for (relative, old_path, new_path), future in run_bounded(executor, compare_pair, pairs, workers * 4):
+            try:
+                yield future.result()
+            except Exception as e:
+                # Worker process died (e.g. killed by OOM), not an analysis error
+                yield {'testcase': relative, 'bucket': relative.split(os.sep)[0], 'transition': 'error',
+                       'changes': [], 'old': None, 'new': None, 'old_path': old_path,
+                       'new_path': new_path, 'error': f'{type(e).__name__}: {e}'}
+
+
+#########################################
+# Output
+#########################################
+
+def describe_side(side):
+    """One-line description of a summarized side."""
+    if side is None:
+        return '-'
+    if 'error' in side:
+        return f"ERROR {side['error']}"
+    if side['status'] in NON_FAILING_STATUSES:
+        return side['status']
+    return f"{side['status']} {side['failure_reason']} @ {side['failing_command']}"
+
+
+def print_delta_line(delta):
+    """Print one changed testcase."""
+    print(f"{delta['transition']:<14} {delta['testcase']}\n"
+          f"{'':<14}   {describe_side(delta['old'])}  =>  {describe_side(delta['new'])}", flush=True)
+
+
+def print_transition_summary(counts, out=sys.stdout):
+    """Print the transition counts, biggest first."""
+    print("=" * 70, file=out)
+    print(f"RELEASE DELTA: {sum(counts.values())} testcases", file=out)
+    print("=" * 70, file=out)
+    for transition, count in counts.most_common():
+        print(f"  {transition:<20} {count}", file=out)
+
+
+#########################################
+# MAIN
+#########################################
+def main():
+    parser = argparse.ArgumentParser(description="Compare testcase results between two release roots.")
+    parser.add_argument('old_root', help='Baseline etautotest root (e.g. release 252)')
+    parser.add_argument('new_root', help='New etautotest root (e.g. release 261)')
+    parser.add_argument('--workers', type=int, default=None, help='Number of workers (default: CPU count)')
+    parser.add_argument('--threads', action='store_true', help='Use a thread pool instead of processes')
+    parser.add_argument('--all', action='store_true', help='Also report unchanged testcases')
+    parser.add_argument('--jsonl', action='store_true', help='Write one JSON delta record per line')
+    parser.add_argument('--output', '-o', default=None,
+                        help='Write --jsonl records to this file instead of stdout (.gz compresses)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+    args = parser.parse_args()
+
+    for root in (args.old_root, args.new_root):
+        if not os.path.isdir(root):
+            print(f"❌ ERROR: Directory does not exist: {os.path.abspath(root)}")
+            sys.exit(1)
+    if args.no_cache:
+        configure_cache(None)
+
+    counts = Counter()
+    out = open_jsonl_output(args.output) if args.jsonl else None
+    try:
+        for delta in compare_releases(args.old_root, args.new_root, args.workers, args.threads):
+            counts[delta['transition']] += 1
+            if delta['transition'] == 'same' and not args.all:
+                continue
+            if out:
+                write_jsonl_record(out, delta)
+            else:
+                print_delta_line(delta)
+    finally:
+        if out and out is not sys.stdout:
+            out.close()
+    # Keep JSON Lines on stdout clean
+    print_transition_summary(counts, sys.stderr if out is sys.stdout else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Generate a release-level triage dashboard from analysis records.
+
+Aggregates per-testcase records (analyze_testcase.py --jsonl output, or a
+directory of analysis JSON files) by bucket, category (Regold / Setup / RnD),
+failure reason, owner and reviewer, and links every testcase to its report
+from generate_report.py --batch.
+
+index.html only carries the summary tables; the testcase list is written as
+paged data files under index_data/ that the page loads on demand, so a
+20k-testcase release still opens instantly.
+
+Usage: python3 generate_index.py <dir|records.jsonl[.gz]|-> <output_dir> [--page-size N]
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from generate_report import (NON_FAILING_STATUSES, REPORT_CSS, STYLESHEET_NAME, escape_html, get_category_class,
+                             iter_records, report_filename)
+
+DEFAULT_PAGE_SIZE = 500
+DATA_DIR_NAME = "index_data"
+
+# Columns of the compact per-testcase rows written to the data pages
+ROW_FIELDS = ['testcase', 'bucket', 'status', 'category', 'failure_reason',
+              'failing_command', 'owner', 'reviewer', 'report']
+
+# Record fields summarize_record() reads
+RECORD_FIELDS = ['testcase_path', 'testcase_name', 'bucket', 'status', 'category', 'failure_reason',
+                 'failing_command', 'owner', 'bucket_owner', 'reviewer']
+
+# Summary tables: (title, row key)
+SUMMARY_DIMENSIONS = [
+    ('Bucket', 'bucket'),
+    ('Category', 'category'),
+    ('Failure Reason', 'failure_reason'),
+    ('Owner', 'owner'),
+    ('Reviewer', 'reviewer'),
+]
+
+INDEX_CSS = """\
+.summary-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(360px, 1fr)); gap: 20px; }
+.counts { display: flex; gap: 15px; flex-wrap: wrap; margin-top: 10px; }
+.count-box { background: #f8f9fa; border: 1px solid #e0e0e0; border-radius: 5px; padding: 10px 20px; text-align: center; }
+.count-box b { display: block; font-size: 22px; color: #1a1a2e; }
+.scroll { max-height: 420px; overflow-y: auto; }
+th.sortable { cursor: pointer; user-select: none; }
+th.sortable:after { content: " \\21C5"; color: #999; }
+td.num { text-align: right; }
+.pager { margin: 10px 0; display: flex; gap: 10px; align-items: center; }
+.pager button { padding: 5px 12px; }
+"""
+
+INDEX_JS = """\
+function sortTable(th) {
+    var table = th.closest('table'), body = table.tBodies[0];
+    var col = Array.prototype.indexOf.call(th.parentNode.children, th);
+    var asc = th.dataset.dir !== 'asc';
+    th.dataset.dir = asc ? 'asc' : 'desc';
+    var rows = Array.prototype.slice.call(body.rows);
+    rows.sort(function (a, b) {
+        var x = a.cells[col].dataset.v || a.cells[col].textContent;
+        var y = b.cells[col].dataset.v || b.cells[col].textContent;
+        var nx = parseFloat(x), ny = parseFloat(y);
+        var cmp = (!isNaN(nx) && !isNaN(ny)) ? nx - ny : x.localeCompare(y);
+        return asc ? cmp : -cmp;
+    });
+    rows.forEach(function (r) { body.appendChild(r); });
+}
+var pages = {}, current = 0;
+function esc(s) {
+    return String(s).replace(/[&<>"]/g, function (c) {
+        return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c];
+    });
+}
+function renderPage(n) {
+    var body = document.getElementById('testcase-rows');
+    body.innerHTML = pages[n].map(function (r) {
+        return '<tr><td><a href="' + esc(encodeURIComponent(r[8])) + '">' + esc(r[0]) + '</a></td>' +
+            r.slice(1, 8).map(function (v) { return '<td>' + esc(v) + '</td>'; }).join('') + '</tr>';
+    }).join('');
+    document.getElementById('page-label').textContent = 'Page ' + n + ' of ' + INDEX.pages;
+}
+function loadIndexPage(n, rows) { pages[n] = rows; if (n === current) renderPage(n); }
+function showPage(n) {
+    if (n < 1 || n > INDEX.pages) return;
+    current = n;
+    if (pages[n]) { renderPage(n); return; }
+    var script = document.createElement('script');
+    script.src = INDEX.dataDir + '/page_' + ('000' + n).slice(-4) + '.js';
+    document.body.appendChild(script);
+}
+document.addEventListener('DOMContentLoaded', function () { if (INDEX.pages) showPage(1); });
+"""
+
+
+def summarize_record(data):
+    """Reduce an analysis record to a compact index row (see ROW_FIELDS)."""
+    return [
+        data.get('testcase_name', 'Unknown'),
+        data.get('bucket', 'Unknown'),
+        data.get('status', 'Unknown'),
+        data.get('category') or 'Untriaged',
+        data.get('failure_reason', 'N/A'),
+        data.get('failing_command', 'N/A'),
+        data.get('owner', data.get('bucket_owner', 'Unknown')),
+        data.get('reviewer', 'Unknown'),
+        report_filename(data),
+    ]
+
+
+def collect_rows(records):
+    """Reduce records to compact rows. Returns (rows, skipped)."""
+    rows = []
+    skipped = 0
+    for data in records:
+        if not isinstance(data, dict) or 'error' in data:
+            skipped += 1
+            continue
+        rows.append(summarize_record(data))
+    return rows, skipped
+
+
+def aggregate(rows):
+    """Count testcases per status and per (dimension value, status)."""
+    status_index = ROW_FIELDS.index('status')
+    totals = Counter(row[status_index] for row in rows)
+    summaries = {}
+    for _, key in SUMMARY_DIMENSIONS:
+        column = ROW_FIELDS.index(key)
+        counts = defaultdict(Counter)
+        for row in rows:
+            counts[row[column]][row[status_index]] += 1
+        summaries[key] = counts
+    return totals, summaries
+
+
+def generate_summary_table(title, counts, statuses):
+    """Generate one sortable summary table (value x status counts)."""
+    header = ''.join(f'<th class="sortable" onclick="sortTable(this)">{escape_html(s)}</th>'
+                     for s in statuses)
+    rows = []
+    for value, by_status in sorted(counts.items(), key=lambda item: -sum(item[1].values())):
+        cells = ''.join(f'<td class="num">{by_status.get(s, 0)}</td>' for s in statuses)
+        rows.append(f'<tr><td>{escape_html(value)}</td>{cells}'
+                    f'<td class="num">{sum(by_status.values())}</td></tr>')
+    return f'''<div class="section">
+                <h2>{escape_html(title)} ({len(counts)})</h2>
+                <div class="scroll">
+                <table>
+                    <thead><tr><th class="sortable" onclick="sortTable(this)">{escape_html(title)}</th>{header}<th class="sortable" onclick="sortTable(this)">Total</th></tr></thead>
+                    <tbody>
+                    {"".join(rows)}
+                    </tbody>
+                </table>
+                </div>
+            </div>'''
+
+
+def generate_category_boxes(counts):
+    """Generate the per-category count boxes."""
+    boxes = []
+    for category, by_status in sorted(counts.items()):
+        boxes.append(f'<span class="count-box"><b>{sum(by_status.values())}</b>'
+                     f'<span class="category-badge category-{get_category_class(category)}">'
+                     f'{escape_html(category)}</span></span>')
+    return ''.join(boxes)
+
+
+def generate_index_html(title, totals, summaries, page_count, page_size):
+    """Generate index.html from the aggregated counts only (no per-testcase rows)."""
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    statuses = sorted(totals)
+    total_boxes = ''.join(f'<span class="count-box"><b>{count}</b>{escape_html(status)}</span>'
+                          for status, count in sorted(totals.items()))
+    tables = ''.join(generate_summary_table(name, summaries[key], statuses)
+                     for name, key in SUMMARY_DIMENSIONS if key != 'category')
+    # Rows are loaded one data page at a time, so sorting only reorders the page shown
+    columns = ''.join(f'<th class="sortable" onclick="sortTable(this)" title="Sort this page">'
+                      f'{escape_html(name.replace("_", " ").title())}</th>'
+                      for name in ROW_FIELDS[:-1])
+    config = json.dumps({'pages': page_count, 'dataDir': DATA_DIR_NAME})
+
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Triage Dashboard - {escape_html(title)}</title>
+    <link rel="stylesheet" href="{STYLESHEET_NAME}">
+    <style>
+{INDEX_CSS}    </style>
+    <script>
+var INDEX = {config};
+{INDEX_JS}    </script>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📊 Release Triage Dashboard</h1>
+            <div class="meta">
+                <span>📁 {escape_html(title)}</span>
+                <span>📅 Generated: {now}</span>
+                <span>🧪 Testcases: {sum(totals.values())}</span>
+            </div>
+        </div>
+
+        <div class="content">
+            <div class="section">
+                <h2>📌 Status</h2>
+                <div class="counts">{total_boxes}</div>
+                <h2 style="margin-top:20px;">🏷️ Category</h2>
+                <div class="counts">{generate_category_boxes(summaries['category'])}</div>
+            </div>
+
+            <div class="summary-grid">
+            {tables}
+            </div>
+
+            <div class="section">
+                <h2>🧪 Testcases ({page_size} per page, failures first; column sorting applies to the current page)</h2>
+                <div class="pager">
+                    <button onclick="showPage(current - 1)">◀ Prev</button>
+                    <span id="page-label">Loading...</span>
+                    <button onclick="showPage(current + 1)">Next ▶</button>
+                </div>
+                <table>
+                    <thead><tr>{columns}</tr></thead>
+                    <tbody id="testcase-rows"></tbody>
+                </table>
+            </div>
+        </div>
+
+        <footer>
+            <p>Generated by Modus CLI Agent - Testcase Analysis Skill</p>
+        </footer>
+    </div>
+</body>
+</html>'''
+
+
+def write_data_pages(rows, data_dir, page_size):
+    """Write rows as page_NNNN.js files that call loadIndexPage(). Returns page count."""
+    os.makedirs(data_dir, exist_ok=True)
+    page_count = 0
+    for start in range(0, len(rows), page_size):
+        page_count += 1
+        payload = json.dumps(rows[start:start + page_size], separators=(',', ':'))
+        with open(os.path.join(data_dir, f"page_{page_count:04d}.js"), 'w') as f:
+            f.write(f"loadIndexPage({page_count},{payload});\n")
+    return page_count
+
+
+def generate_index(source, output_dir, page_size=DEFAULT_PAGE_SIZE, title=None):
+    """
+    Build index.html plus paged row data in output_dir. source is anything
+    iter_records() reads, or an iterable of records (e.g. from watch mode).
+    Returns (testcases_indexed, records_skipped).
+    """
+    if isinstance(source, str):
+        records = iter_records(source)
+        title = title or source
+    else:
+        records = source
+    rows, skipped = collect_rows(records)
+    status_index = ROW_FIELDS.index('status')
+    # Failures first, then by bucket and testcase name
+    rows.sort(key=lambda row: (row[status_index] in NON_FAILING_STATUSES, row[1], row[0]))
+    totals, summaries = aggregate(rows)
+
+    os.makedirs(output_dir, exist_ok=True)
+    stylesheet_path = os.path.join(output_dir, STYLESHEET_NAME)
+    if not os.path.exists(stylesheet_path):
+        with open(stylesheet_path, 'w') as f:
+            f.write(REPORT_CSS)
+    page_count = write_data_pages(rows, os.path.join(output_dir, DATA_DIR_NAME), page_size)
+
+    html_content = generate_index_html(title or 'Release', totals, summaries, page_count, page_size)
+    with open(os.path.join(output_dir, 'index.html'), 'w') as f:
+        f.write(html_content)
+    return len(rows), skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a release triage dashboard from analysis records.")
+    parser.add_argument('source', help='Directory of JSON/JSONL files, a JSONL[.gz] file, or - for stdin')
+    parser.add_argument('output_dir', help='Directory for index.html (normally the generate_report.py --batch output)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'Testcases per lazily loaded page (default: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--title', default=None, help='Dashboard title (default: source path)')
+    args = parser.parse_args()
+
+    try:
+        indexed, skipped = generate_index(args.source, args.output_dir, args.page_size, args.title)
+    except (OSError, ValueError) as e:
+        print(f"Error generating index: {e}")
+        sys.exit(1)
+    print(f"✅ Index generated: {os.path.join(args.output_dir, 'index.html')} "
+          f"({indexed} testcases, {skipped} records skipped)")
+
+
+if __name__ == "__main__":
+    main()
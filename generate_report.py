@@ -2,24 +2,83 @@
 """
 Generate HTML report from JSON analysis data.
 Usage: python3 generate_report.py <json_file> [output_dir]
+
+Batch mode renders every record in a directory of JSON files or a JSONL
+stream (e.g. analyze_testcase.py --jsonl output) in one process, or across
+a process pool, with one shared report.css:
+       python3 generate_report.py --batch <dir|records.jsonl[.gz]|-> <output_dir> [--workers N]
 """
 
+import argparse
+import gzip
+import hashlib
 import json
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import html
 import random
 import string
 
+# Stylesheet shared by all reports: inlined for single reports, written
+# once as STYLESHEET_NAME and linked in batch mode
+REPORT_CSS = """\
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; padding: 20px; }
+.container { max-width: 1200px; margin: 0 auto; }
+.header { background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%); color: white; padding: 30px; border-radius: 10px 10px 0 0; }
+.header h1 { font-size: 24px; margin-bottom: 10px; }
+.header .meta { display: flex; gap: 20px; flex-wrap: wrap; font-size: 14px; opacity: 0.9; }
+.status-badge { display: inline-block; padding: 5px 15px; border-radius: 20px; font-weight: bold; font-size: 14px; }
+.status-passed { background: #00c853; color: white; }
+.status-failed { background: #ff1744; color: white; }
+.category-badge { display: inline-block; padding: 5px 15px; border-radius: 20px; font-weight: bold; font-size: 14px; margin-left: 10px; }
+.category-regold { background: #4caf50; color: white; }
+.category-setup { background: #ff9800; color: white; }
+.category-rnd { background: #f44336; color: white; }
+.content { background: white; padding: 30px; border-radius: 0 0 10px 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+.section { margin-bottom: 30px; }
+.section h2 { color: #1a1a2e; font-size: 18px; margin-bottom: 15px; padding-bottom: 10px; border-bottom: 2px solid #e0e0e0; }
+table { width: 100%; border-collapse: collapse; margin-top: 10px; }
+th, td { padding: 12px 15px; text-align: left; border-bottom: 1px solid #e0e0e0; }
+th { background: #f8f9fa; color: #1a1a2e; font-weight: 600; }
+tr:hover { background: #f5f5f5; }
+.evidence-box { background: #f8f9fa; border: 1px solid #e0e0e0; border-radius: 5px; padding: 15px; margin: 10px 0; font-family: 'Courier New', monospace; font-size: 13px; white-space: pre-wrap; overflow-x: auto; }
+.solution-box { background: #e8f5e9; border: 1px solid #4caf50; border-radius: 5px; padding: 20px; margin: 10px 0; }
+.solution-box h3 { color: #2e7d32; margin-bottom: 10px; }
+.fix-code { background: #1a1a2e; color: #00ff00; padding: 15px; border-radius: 5px; font-family: 'Courier New', monospace; margin: 10px 0; white-space: pre-wrap; }
+.confidence { display: inline-block; padding: 3px 10px; border-radius: 3px; font-weight: bold; }
+.confidence-high { background: #c8e6c9; color: #2e7d32; }
+.confidence-medium { background: #fff3e0; color: #e65100; }
+.confidence-low { background: #ffcdd2; color: #c62828; }
+.files-list { list-style: none; }
+.files-list li { padding: 5px 0; border-bottom: 1px solid #eee; }
+.files-list li:before { content: "📄 "; }
+.reasoning-chain { background: #fff8e1; border-left: 4px solid #ffc107; padding: 15px; margin: 10px 0; }
+.reasoning-chain ol { margin-left: 20px; }
+.reasoning-chain li { margin: 8px 0; }
+footer { text-align: center; margin-top: 30px; color: #666; font-size: 12px; }
+code { background: #f0f0f0; padding: 2px 6px; border-radius: 3px; font-family: 'Courier New', monospace; }
+"""
+STYLESHEET_NAME = "report.css"
+# Record statuses that are not failures (Ignored: skipped by an IGNORE/SKIP_*/ON_* control file)
+NON_FAILING_STATUSES = ('Pass', 'Ignored')
+INLINE_STYLE_TAG = "<style>\n" + "".join(f"        {line}" for line in REPORT_CSS.splitlines(True)) + "    </style>"
+
 def escape_html(text):
     """Escape HTML special characters."""
     if text is None:
         return ""
     return html.escape(str(text))
 
-def generate_report_id():
-    """Generate random 8-character report ID."""
+def generate_report_id(data=None):
+    """
+    Generate 8-character report ID. Deterministic for a testcase path, so
+    reports and the release index can link to each other; random otherwise.
+    """
+    if data and data.get('testcase_path'):
+        return hashlib.sha1(data['testcase_path'].encode()).hexdigest()[:8].upper()
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
 
 def get_status_class(status):
@@ -72,12 +131,19 @@ def generate_evidence_rows(evidence):
         </tr>""")
     return "\n".join(rows)
 
-def generate_html(data):
-    """Generate full HTML report from data dictionary."""
+def generate_html(data, stylesheet=None):
+    """
+    Generate full HTML report from data dictionary.
+    With stylesheet (a relative href), link it instead of inlining REPORT_CSS.
+    """
     
     # Set defaults
-    report_id = generate_report_id()
+    report_id = generate_report_id(data)
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if stylesheet:
+        stylesheet_tag = f'<link rel="stylesheet" href="{escape_html(stylesheet)}">'
+    else:
+        stylesheet_tag = INLINE_STYLE_TAG
     
     # Extract data with defaults
     testcase_name = data.get('testcase_name', 'Unknown')
@@ -86,12 +152,13 @@ def generate_html(data):
     category = data.get('category', 'Unknown')
     confidence = data.get('confidence', 'LOW')
     rd_engineer = data.get('rd_engineer', 'N/A')
-    bucket_owner = data.get('bucket_owner', 'N/A')
+    # analyze_testcase.py records use 'owner' / 'failure_reason'
+    bucket_owner = data.get('bucket_owner', data.get('owner', 'N/A'))
     purpose = data.get('purpose', 'N/A')
     test_targets = data.get('test_targets', 'N/A')
     testmodes = data.get('testmodes', 'N/A')
     failure_point = data.get('failure_point', 'N/A')
-    error_type = data.get('error_type', 'N/A')
+    error_type = data.get('error_type', data.get('failure_reason', 'N/A'))
     failing_command = data.get('failing_command', 'N/A')
     exit_status = data.get('exit_status', 'N/A')
     expected_behavior = data.get('expected_behavior', 'N/A')
@@ -131,44 +198,7 @@ def generate_html(data):
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Testcase Analysis Report - {escape_html(testcase_name)}</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; padding: 20px; }}
-        .container {{ max-width: 1200px; margin: 0 auto; }}
-        .header {{ background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%); color: white; padding: 30px; border-radius: 10px 10px 0 0; }}
-        .header h1 {{ font-size: 24px; margin-bottom: 10px; }}
-        .header .meta {{ display: flex; gap: 20px; flex-wrap: wrap; font-size: 14px; opacity: 0.9; }}
-        .status-badge {{ display: inline-block; padding: 5px 15px; border-radius: 20px; font-weight: bold; font-size: 14px; }}
-        .status-passed {{ background: #00c853; color: white; }}
-        .status-failed {{ background: #ff1744; color: white; }}
-        .category-badge {{ display: inline-block; padding: 5px 15px; border-radius: 20px; font-weight: bold; font-size: 14px; margin-left: 10px; }}
-        .category-regold {{ background: #4caf50; color: white; }}
-        .category-setup {{ background: #ff9800; color: white; }}
-        .category-rnd {{ background: #f44336; color: white; }}
-        .content {{ background: white; padding: 30px; border-radius: 0 0 10px 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .section {{ margin-bottom: 30px; }}
-        .section h2 {{ color: #1a1a2e; font-size: 18px; margin-bottom: 15px; padding-bottom: 10px; border-bottom: 2px solid #e0e0e0; }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 10px; }}
-        th, td {{ padding: 12px 15px; text-align: left; border-bottom: 1px solid #e0e0e0; }}
-        th {{ background: #f8f9fa; color: #1a1a2e; font-weight: 600; }}
-        tr:hover {{ background: #f5f5f5; }}
-        .evidence-box {{ background: #f8f9fa; border: 1px solid #e0e0e0; border-radius: 5px; padding: 15px; margin: 10px 0; font-family: 'Courier New', monospace; font-size: 13px; white-space: pre-wrap; overflow-x: auto; }}
-        .solution-box {{ background: #e8f5e9; border: 1px solid #4caf50; border-radius: 5px; padding: 20px; margin: 10px 0; }}
-        .solution-box h3 {{ color: #2e7d32; margin-bottom: 10px; }}
-        .fix-code {{ background: #1a1a2e; color: #00ff00; padding: 15px; border-radius: 5px; font-family: 'Courier New', monospace; margin: 10px 0; white-space: pre-wrap; }}
-        .confidence {{ display: inline-block; padding: 3px 10px; border-radius: 3px; font-weight: bold; }}
-        .confidence-high {{ background: #c8e6c9; color: #2e7d32; }}
-        .confidence-medium {{ background: #fff3e0; color: #e65100; }}
-        .confidence-low {{ background: #ffcdd2; color: #c62828; }}
-        .files-list {{ list-style: none; }}
-        .files-list li {{ padding: 5px 0; border-bottom: 1px solid #eee; }}
-        .files-list li:before {{ content: "📄 "; }}
-        .reasoning-chain {{ background: #fff8e1; border-left: 4px solid #ffc107; padding: 15px; margin: 10px 0; }}
-        .reasoning-chain ol {{ margin-left: 20px; }}
-        .reasoning-chain li {{ margin: 8px 0; }}
-        footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 12px; }}
-        code {{ background: #f0f0f0; padding: 2px 6px; border-radius: 3px; font-family: 'Courier New', monospace; }}
-    </style>
+    {stylesheet_tag}
 </head>
 <body>
     <div class="container">
@@ -316,27 +346,144 @@ def generate_html(data):
     
     return html_template
 
+def report_filename(data, timestamp=None):
+    """
+    Build the report file name for a record. Without a timestamp the name
+    uses the report ID, so it is stable across runs and safe to link to.
+    """
+    testcase_name = data.get('testcase_name', 'unknown').replace('/', '_').replace(' ', '_')
+    return f"report_{testcase_name}_{timestamp or generate_report_id(data)}.html"
+
+
+def write_report(data, output_file, stylesheet=None):
+    """Render one record to output_file. Returns output_file."""
+    html_content = generate_html(data, stylesheet)
+    with open(output_file, 'w') as f:
+        f.write(html_content)
+    return output_file
+
+
+def write_report_task(task):
+    """Process-pool entry point: task is (data, output_file, stylesheet)."""
+    return write_report(*task)
+
+
+def iter_records(source):
+    """
+    Yield analysis records from a directory of *.json / *.jsonl[.gz] files,
+    a single JSON or JSONL[.gz] file, or '-' for JSONL on stdin.
+    """
+    if source == '-':
+        yield from iter_jsonl(sys.stdin)
+        return
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.endswith(('.json', '.jsonl', '.jsonl.gz')):
+                yield from iter_records(os.path.join(source, name))
+        return
+    if source.endswith('.gz'):
+        with gzip.open(source, 'rt', encoding='utf-8') as f:
+            yield from iter_jsonl(f)
+    elif source.endswith('.jsonl'):
+        with open(source, encoding='utf-8') as f:
+            yield from iter_jsonl(f)
+    else:
+        with open(source, encoding='utf-8') as f:
+            yield json.load(f)
+
+
+def iter_jsonl(lines):
+    """Yield one record per non-empty JSON line."""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def generate_batch(source, output_dir, workers=1):
+    """
+    Render every record from source into output_dir, all linking one
+    shared stylesheet. Reports are named report_<testcase>_<report_id>.html.
+    Returns (reports_written, records_skipped).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, STYLESHEET_NAME), 'w') as f:
+        f.write(REPORT_CSS)
+    
+    skipped = 0
+    
+    def tasks():
+        nonlocal skipped
+        for data in iter_records(source):
+            if not isinstance(data, dict) or 'error' in data:
+                skipped += 1
+                continue
+            # Path-derived names: same-named testcases in different buckets
+            # don't collide, and generate_index.py can link to them
+            yield data, os.path.join(output_dir, report_filename(data)), STYLESHEET_NAME
+    
+    written = 0
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(write_report_task, tasks(), chunksize=32):
+                written += 1
+    else:
+        for task in tasks():
+            write_report_task(task)
+            written += 1
+    return written, skipped
+
+
+def print_usage():
+    """Print usage with an example JSON structure."""
+    print("Usage: python3 generate_report.py <json_file> [output_dir]")
+    print("       python3 generate_report.py --batch <dir|records.jsonl[.gz]|-> <output_dir> [--workers N]")
+    print("\nExample JSON structure:")
+    print(json.dumps({
+        "testcase_name": "my_testcase",
+        "testcase_path": "/path/to/testcase",
+        "status": "FAILED",
+        "category": "SETUP ISSUE",
+        "confidence": "HIGH",
+        "root_cause": "Typo in Makefile",
+        "solution": {
+            "item": "Makefile typo",
+            "location": "Makefile:42",
+            "fix_command": "sed -i 's/old/new/' Makefile"
+        }
+    }, indent=2))
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python3 generate_report.py <json_file> [output_dir]")
-        print("\nExample JSON structure:")
-        print(json.dumps({
-            "testcase_name": "my_testcase",
-            "testcase_path": "/path/to/testcase",
-            "status": "FAILED",
-            "category": "SETUP ISSUE",
-            "confidence": "HIGH",
-            "root_cause": "Typo in Makefile",
-            "solution": {
-                "item": "Makefile typo",
-                "location": "Makefile:42",
-                "fix_command": "sed -i 's/old/new/' Makefile"
-            }
-        }, indent=2))
+        print_usage()
         sys.exit(1)
     
-    json_file = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.dirname(json_file)
+    parser = argparse.ArgumentParser(description="Generate HTML report(s) from JSON analysis data.")
+    parser.add_argument('json_file', help='JSON file (with --batch: directory, JSONL[.gz] file or -)')
+    parser.add_argument('output_dir', nargs='?', default=None, help='Directory for the HTML report(s)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Render every record from json_file with one shared stylesheet')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for --batch (default: 1, in-process)')
+    args = parser.parse_args()
+    
+    json_file = args.json_file
+    output_dir = args.output_dir
+    
+    if args.batch:
+        if output_dir is None:
+            output_dir = json_file if os.path.isdir(json_file) else os.path.dirname(json_file) or '.'
+        try:
+            written, skipped = generate_batch(json_file, output_dir, args.workers)
+        except (OSError, ValueError) as e:
+            print(f"Error generating reports: {e}")
+            sys.exit(1)
+        print(f"✅ {written} reports generated in {output_dir} ({skipped} records skipped)")
+        return
+    
+    if output_dir is None:
+        output_dir = os.path.dirname(json_file)
     
     # Read JSON data
     try:
@@ -346,18 +493,13 @@ def main():
         print(f"Error reading JSON file: {e}")
         sys.exit(1)
     
-    # Generate HTML
-    html_content = generate_html(data)
-    
     # Generate output filename
-    testcase_name = data.get('testcase_name', 'unknown').replace('/', '_').replace(' ', '_')
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(output_dir, f"report_{testcase_name}_{timestamp}.html")
+    output_file = os.path.join(output_dir, report_filename(data, timestamp))
     
     # Write HTML file
     try:
-        with open(output_file, 'w') as f:
-            f.write(html_content)
+        write_report(data, output_file)
         print(f"✅ Report generated: {output_file}")
     except Exception as e:
         print(f"Error writing HTML file: {e}")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Release-wide trend rankings built from analyze_testcase.py records.
+
+Usage:
+    python3 release_trends.py runtime <dir|records.jsonl[.gz]|-> [--metric total_runtime] [--threshold 0.5] [--top 25] [--json]
+    python3 release_trends.py history <dir|records.jsonl[.gz]|-> [--top 25] [--json]
+
+runtime: the "slowest regressions" ranking. Every record's runtime block
+(latest runtime_statistics row vs. the median of its recent PASSED builds)
+is re-checked against --threshold and the regressed testcases are ranked
+by how much the metric grew.
+
+history: the flakiness / regold churn index. Per-bucket pass rate, flips
+and regolds from every record's testcase.history metrics, plus the most
+flaky and most regolded testcases.
+
+Both read the runtime/history blocks every record carries, including the
+compact tier-1 records of passing testcases.
+"""
+
+import argparse
+import heapq
+import json
+import sys
+from collections import defaultdict
+
+from analyze_testcase import (RUNTIME_METRICS, RUNTIME_REGRESSION_THRESHOLD, format_duration,
+                              runtime_regressions)
+from generate_report import iter_records
+
+
+#########################################
+# Runtime Regressions
+#########################################
+
+def format_metric(metric, value):
+    """Format a runtime metric value for display."""
+    if value is None:
+        return 'NA'
+    return f"{value:.1f} MB" if metric.endswith('_mb') else format_duration(value)
+
+
+def rank_runtime_regressions(records, metric='total_runtime', threshold=RUNTIME_REGRESSION_THRESHOLD, top=25):
+    """
+    Rank testcases whose metric regressed, largest growth first.
+    Streams the records and keeps only the top entries in memory.
+    Returns (ranking, counts) where counts maps metric -> regressed testcases.
+    """
+    ranking = []
+    counts = {m: 0 for m in RUNTIME_METRICS}
+    for sequence, record in enumerate(records):
+        runtime = record.get('runtime') if isinstance(record, dict) else None
+        if not runtime:
+            continue
+        regressions = runtime_regressions(runtime['current'], runtime['baseline'], threshold)
+        for m in regressions:
+            counts[m] += 1
+        if metric not in regressions:
+            continue
+        current, baseline = runtime['current'][metric], runtime['baseline'][metric]
+        entry = {
+            'testcase_path': record.get('testcase_path'),
+            'bucket': record.get('bucket', 'Unknown'),
+            'owner': record.get('owner', 'Unknown'),
+            'status': record.get('status', 'Unknown'),
+            'build': runtime['build'],
+            'current': current,
+            'baseline': baseline,
+            'delta': current - baseline,
+            'ratio': round(current / baseline, 2) if baseline else None,
+            'regressions': regressions,
+        }
+        item = (entry['delta'], -sequence, entry)
+        if len(ranking) < top:
+            heapq.heappush(ranking, item)
+        elif item[:2] > ranking[0][:2]:
+            heapq.heapreplace(ranking, item)
+    return [entry for _, _, entry in sorted(ranking, key=lambda item: item[:2], reverse=True)], counts
+
+
+def print_runtime_ranking(ranking, counts, metric, threshold):
+    """Print the slowest regressions as a table."""
+    print("=" * 100)
+    print(f"SLOWEST REGRESSIONS: {metric} (threshold +{threshold:.0%})")
+    regressed = ", ".join(f"{m}={n}" for m, n in counts.items() if n)
+    print(f"  Regressed testcases: {regressed or 'none'}")
+    print("=" * 100)
+    for rank, entry in enumerate(ranking, 1):
+        ratio = f"x{entry['ratio']}" if entry['ratio'] else ''
+        print(f"{rank:>3}. +{format_metric(metric, entry['delta']):<12} {ratio:<7} "
+              f"{format_metric(metric, entry['baseline'])} -> {format_metric(metric, entry['current'])}  "
+              f"{entry['owner']:<12} {entry['testcase_path']}")
+
+
+#########################################
+# History Trends
+#########################################
+
+def push_top(heap, top, key, entry):
+    """Keep the top entries by key in a bounded min-heap."""
+    item = (key, entry['testcase_path'] or '', entry)
+    if len(heap) < top:
+        heapq.heappush(heap, item)
+    elif item[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, item)
+
+
+def build_history_index(records, top=25):
+    """
+    Aggregate testcase.history metrics per bucket and rank the most flaky
+    (flips) and most regolded testcases. Streams the records.
+    """
+    buckets = defaultdict(lambda: {'testcases': 0, 'runs': 0, 'passes': 0, 'flips': 0,
+                                   'regolds': 0, 'flaky': 0, 'regold_churn': 0})
+    flaky, churn = [], []
+    for record in records:
+        history = record.get('history') if isinstance(record, dict) else None
+        if not history:
+            continue
+        bucket = buckets[record.get('bucket', 'Unknown')]
+        bucket['testcases'] += 1
+        bucket['runs'] += history['runs']
+        bucket['passes'] += round((history['pass_rate'] or 0) * history['runs'])
+        bucket['flips'] += history['flips']
+        bucket['regolds'] += history['regolds']
+        bucket['flaky'] += history['flaky']
+        bucket['regold_churn'] += history['regold_churn']
+        entry = {'testcase_path': record.get('testcase_path'), 'bucket': record.get('bucket', 'Unknown'),
+                 'owner': record.get('owner', 'Unknown'), 'status': record.get('status', 'Unknown'),
+                 **history}
+        if history['flaky']:
+            push_top(flaky, top, history['flips'], entry)
+        if history['regold_churn']:
+            push_top(churn, top, history['regolds'], entry)
+
+    summary = {}
+    for name, bucket in sorted(buckets.items()):
+        bucket['pass_rate'] = round(bucket.pop('passes') / bucket['runs'], 3) if bucket['runs'] else None
+        summary[name] = bucket
+    ranked = lambda heap: [entry for _, _, entry in sorted(heap, key=lambda item: item[:2], reverse=True)]
+    return {'buckets': summary, 'flaky': ranked(flaky), 'regold_churn': ranked(churn)}
+
+
+def print_history_index(index):
+    """Print the per-bucket table and the flaky / regold churn rankings."""
+    print("=" * 100)
+    print("HISTORY TRENDS BY BUCKET")
+    print("=" * 100)
+    print(f"{'Bucket':<30} {'Tests':>6} {'Runs':>7} {'Pass%':>6} {'Flips':>6} {'Regolds':>8} {'Flaky':>6} {'Churn':>6}")
+    for name, bucket in index['buckets'].items():
+        rate = f"{bucket['pass_rate']:.0%}" if bucket['pass_rate'] is not None else 'n/a'
+        print(f"{name:<30} {bucket['testcases']:>6} {bucket['runs']:>7} {rate:>6} {bucket['flips']:>6} "
+              f"{bucket['regolds']:>8} {bucket['flaky']:>6} {bucket['regold_churn']:>6}")
+    for title, key, metric in (('MOST FLAKY', 'flaky', 'flips'), ('REGOLD CHURN', 'regold_churn', 'regolds')):
+        print("-" * 100)
+        print(f"{title} ({len(index[key])})")
+        for rank, entry in enumerate(index[key], 1):
+            print(f"{rank:>3}. {metric}={entry[metric]:<3} pass_rate={entry['pass_rate']}  "
+                  f"{entry['owner']:<12} {entry['testcase_path']}")
+
+
+#########################################
+# MAIN
+#########################################
+def main():
+    parser = argparse.ArgumentParser(description="Release-wide trend rankings from analysis records.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    runtime = subparsers.add_parser('runtime', help='Rank runtime / disk footprint regressions')
+    runtime.add_argument('source', help='Directory of JSON/JSONL files, a JSONL[.gz] file, or - for stdin')
+    runtime.add_argument('--metric', choices=RUNTIME_METRICS, default='total_runtime',
+                         help='Metric to rank by (default: total_runtime)')
+    runtime.add_argument('--threshold', type=float, default=RUNTIME_REGRESSION_THRESHOLD,
+                         help=f'Relative growth that counts as a regression (default: {RUNTIME_REGRESSION_THRESHOLD})')
+    runtime.add_argument('--top', type=int, default=25, help='Number of testcases to list (default: 25)')
+    runtime.add_argument('--json', action='store_true', help='Output JSON')
+
+    history = subparsers.add_parser('history', help='Flakiness and regold churn index')
+    history.add_argument('source', help='Directory of JSON/JSONL files, a JSONL[.gz] file, or - for stdin')
+    history.add_argument('--top', type=int, default=25, help='Number of testcases to list (default: 25)')
+    history.add_argument('--json', action='store_true', help='Output JSON')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'runtime':
+            ranking, counts = rank_runtime_regressions(iter_records(args.source), args.metric,
+                                                       args.threshold, args.top)
+            result = {'metric': args.metric, 'threshold': args.threshold,
+                      'regressed': counts, 'ranking': ranking}
+        else:
+            result = build_history_index(iter_records(args.source), args.top)
+    except (OSError, ValueError) as e:
+        print(f"Error reading records: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.command == 'runtime':
+        print_runtime_ranking(ranking, counts, args.metric, args.threshold)
+    else:
+        print_history_index(result)
+
+
+if __name__ == "__main__":
+    main()
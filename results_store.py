@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+SQLite store for analyze_testcase.py results.
+
+Each analysis is upserted into a small normalized schema so release-wide
+questions are answered from indexes instead of a fresh sweep:
+
+    testcase   one row per testcase path (bucket, owner, reviewer, latest run)
+    run        one row per analysis (status, failure reason, command, ...)
+    diff_file  the run's *.diff.bak files in priority order
+    key_file   the run's key files by kind (exists, log_files, gold_files)
+    exit_status_change  the run's status.log exit codes that differ from the gold
+
+Usage:
+    python3 analyze_testcase.py <root> --batch --db results.db
+    python3 results_store.py load results.db <dir|records.jsonl[.gz]|->
+    python3 results_store.py query results.db --owner jdoe --bucket ett/sanity --reason "Exit status"
+    python3 results_store.py query results.db --status Fail --count-by failing_command
+    python3 results_store.py query results.db --exit-change build_model:0:5 --signal SIGSEGV
+
+Queries look at the latest run of every testcase.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from generate_report import iter_records
+
+#########################################
+# Schema
+#########################################
+SCHEMA_VERSION = 2
+# Older versions open_store() upgrades in place (2 only adds exit_status_change)
+UPGRADABLE_VERSIONS = (1,)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS testcase (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT,
+    bucket TEXT,
+    owner TEXT,
+    reviewer TEXT,
+    latest_run_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY,
+    testcase_id INTEGER NOT NULL REFERENCES testcase(id),
+    analysis_time TEXT NOT NULL,
+    status TEXT,
+    test_log_status TEXT,
+    failure_reason TEXT,
+    failure_reason_2 TEXT,
+    failing_command TEXT,
+    rd_engineer TEXT,
+    version_line TEXT,
+    gold_runtime TEXT,
+    ccr_number TEXT,
+    already_ccr TEXT,
+    gold_dir TEXT,
+    record TEXT NOT NULL,
+    UNIQUE (testcase_id, analysis_time)
+);
+CREATE TABLE IF NOT EXISTS diff_file (
+    run_id INTEGER NOT NULL REFERENCES run(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE TABLE IF NOT EXISTS key_file (
+    run_id INTEGER NOT NULL REFERENCES run(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (run_id, kind, name)
+);
+CREATE TABLE IF NOT EXISTS exit_status_change (
+    run_id INTEGER NOT NULL REFERENCES run(id) ON DELETE CASCADE,
+    command TEXT NOT NULL,
+    gold_code INTEGER,
+    actual_code INTEGER,
+    signal TEXT,
+    PRIMARY KEY (run_id, command)
+);
+CREATE INDEX IF NOT EXISTS testcase_bucket ON testcase(bucket);
+CREATE INDEX IF NOT EXISTS testcase_owner ON testcase(owner);
+CREATE INDEX IF NOT EXISTS run_status ON run(status);
+CREATE INDEX IF NOT EXISTS run_failure_reason ON run(failure_reason);
+CREATE INDEX IF NOT EXISTS run_failing_command ON run(failing_command);
+CREATE INDEX IF NOT EXISTS diff_file_name ON diff_file(name);
+CREATE INDEX IF NOT EXISTS exit_status_change_command ON exit_status_change(command, gold_code, actual_code);
+CREATE INDEX IF NOT EXISTS exit_status_change_signal ON exit_status_change(signal);
+"""
+
+# Record fields stored as run columns
+RUN_FIELDS = ['status', 'test_log_status', 'failure_reason', 'failure_reason_2', 'failing_command',
+              'rd_engineer', 'version_line', 'gold_runtime', 'ccr_number', 'already_ccr', 'gold_dir']
+
+# key_files kinds stored in key_file (diff.bak files go to diff_file)
+KEY_FILE_KINDS = ['exists', 'log_files', 'gold_files']
+
+# Query filters: option name -> column of the latest-run join
+QUERY_FILTERS = {
+    'bucket': 't.bucket',
+    'owner': 't.owner',
+    'reviewer': 't.reviewer',
+    'status': 'r.status',
+    'reason': 'r.failure_reason',
+    'command': 'r.failing_command',
+}
+
+# Columns --count-by can group on
+COUNT_BY = {'bucket': 't.bucket', 'owner': 't.owner', 'reviewer': 't.reviewer', 'status': 'r.status',
+            'failure_reason': 'r.failure_reason', 'failing_command': 'r.failing_command'}
+
+# Results committed per transaction while loading
+COMMIT_EVERY = 500
+
+
+#########################################
+# Storing
+#########################################
+
+def open_store(path):
+    """Open (creating if needed) a results database and return the connection."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version not in (0, SCHEMA_VERSION, *UPGRADABLE_VERSIONS):
+        conn.close()
+        raise ValueError(f'{path}: results schema version {version}, expected {SCHEMA_VERSION}')
+    conn.executescript(SCHEMA)
+    conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+    return conn
+
+
+def store_result(conn, record):
+    """
+    Upsert one analysis record. Re-storing the same analysis (same path and
+    analysis_time, e.g. a cached result) replaces it instead of adding a run.
+    Returns False for error records, which are not stored.
+    """
+    if not isinstance(record, dict) or 'error' in record or 'testcase_path' not in record:
+        return False
+    conn.execute(
+        'INSERT INTO testcase (path, name, bucket, owner, reviewer) VALUES (?, ?, ?, ?, ?) '
+        'ON CONFLICT(path) DO UPDATE SET name=excluded.name, bucket=excluded.bucket, '
+        'owner=COALESCE(excluded.owner, testcase.owner), '
+        'reviewer=COALESCE(excluded.reviewer, testcase.reviewer)',
+        (record['testcase_path'], record.get('testcase_name'), record.get('bucket'),
+         record.get('owner'), record.get('reviewer')))
+    testcase_id = conn.execute('SELECT id FROM testcase WHERE path = ?',
+                               (record['testcase_path'],)).fetchone()[0]
+
+    analysis_time = record.get('analysis_time') or ''
+    conn.execute('DELETE FROM run WHERE testcase_id = ? AND analysis_time = ?', (testcase_id, analysis_time))
+    values = [str(record[field]) if record.get(field) is not None else None for field in RUN_FIELDS]
+    run_id = conn.execute(
+        f'INSERT INTO run (testcase_id, analysis_time, {", ".join(RUN_FIELDS)}, record) '
+        f'VALUES (?, ?, {", ".join("?" * len(RUN_FIELDS))}, ?)',
+        (testcase_id, analysis_time, *values, json.dumps(record, separators=(',', ':'), default=str))
+    ).lastrowid
+
+    conn.executemany('INSERT INTO diff_file (run_id, position, name) VALUES (?, ?, ?)',
+                     [(run_id, position, name) for position, name in enumerate(record.get('diff_bak_files') or [])])
+    key_files = record.get('key_files') or {}
+    conn.executemany('INSERT OR IGNORE INTO key_file (run_id, kind, name) VALUES (?, ?, ?)',
+                     [(run_id, kind, name) for kind in KEY_FILE_KINDS for name in key_files.get(kind) or []])
+    conn.executemany('INSERT OR REPLACE INTO exit_status_change (run_id, command, gold_code, actual_code, signal) '
+                     'VALUES (?, ?, ?, ?, ?)',
+                     [(run_id, change.get('command'), change.get('gold_code'), change.get('actual_code'),
+                       change.get('signal')) for change in record.get('exit_status_changes') or []
+                      if isinstance(change, dict) and change.get('command')])
+
+    # Latest run by analysis time (older records may be loaded after newer ones)
+    conn.execute(
+        'UPDATE testcase SET latest_run_id = (SELECT id FROM run WHERE testcase_id = ? '
+        'ORDER BY analysis_time DESC, id DESC LIMIT 1) WHERE id = ?', (testcase_id, testcase_id))
+    return True
+
+
+def store_results(conn, records, commit_every=COMMIT_EVERY):
+    """Upsert a stream of records in batched transactions. Returns (stored, skipped)."""
+    stored = skipped = 0
+    for record in records:
+        if store_result(conn, record):
+            stored += 1
+            if stored % commit_every == 0:
+                conn.commit()
+        else:
+            skipped += 1
+    conn.commit()
+    return stored, skipped
+
+
+#########################################
+# Querying
+#########################################
+
+def parse_exit_change(spec):
+    """
+    Parse an --exit-change filter 'COMMAND[:GOLD[:ACTUAL]]' (empty or *
+    parts match anything) into (command, gold_code, actual_code).
+    """
+    parts = spec.split(':')
+    if len(parts) > 3:
+        raise ValueError(f'Bad exit change "{spec}", expected COMMAND[:GOLD[:ACTUAL]]')
+    parts += [''] * (3 - len(parts))
+    command, gold, actual = [None if part in ('', '*') else part for part in parts]
+    return command, int(gold) if gold is not None else None, int(actual) if actual is not None else None
+
+
+def exit_change_condition(values):
+    """EXISTS clause and parameters matching a run with any of the parse_exit_change() values."""
+    alternatives, params = [], []
+    for value in values:
+        terms = [f'e.{column} = ?' for column, part in zip(['command', 'gold_code', 'actual_code'], value)
+                 if part is not None]
+        alternatives.append(' AND '.join(terms) or '1')
+        params.extend(part for part in value if part is not None)
+    return (f'EXISTS (SELECT 1 FROM exit_status_change e WHERE e.run_id = r.id '
+            f'AND (({") OR (".join(alternatives)})))'), params
+
+
+def build_query(filters, count_by=None, limit=None):
+    """
+    Build the SQL and parameters for a latest-run query.
+    filters: {QUERY_FILTERS key, 'diff_file', 'exit_change' or 'signal':
+    [values]} (values of one key are OR'ed, keys are AND'ed). exit_change
+    values are parse_exit_change() tuples.
+    """
+    where, params = [], []
+    for key, values in filters.items():
+        if not values:
+            continue
+        placeholders = ', '.join('?' * len(values))
+        if key == 'exit_change':
+            condition, condition_params = exit_change_condition(values)
+            where.append(condition)
+            params.extend(condition_params)
+            continue
+        if key == 'signal':
+            where.append(f'EXISTS (SELECT 1 FROM exit_status_change e WHERE e.run_id = r.id '
+                         f'AND e.signal IN ({placeholders}))')
+        elif key == 'diff_file':
+            where.append(f'EXISTS (SELECT 1 FROM diff_file d WHERE d.run_id = r.id AND d.name IN ({placeholders}))')
+        else:
+            where.append(f'{QUERY_FILTERS[key]} IN ({placeholders})')
+        params.extend(values)
+    if count_by:
+        select = f'SELECT {COUNT_BY[count_by]} AS value, COUNT(*) AS testcases'
+    else:
+        select = 'SELECT t.path, r.status, r.failure_reason, r.failing_command, t.owner, r.record'
+    sql = select + ' FROM testcase t JOIN run r ON r.id = t.latest_run_id'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    if count_by:
+        sql += ' GROUP BY value ORDER BY testcases DESC, value'
+    else:
+        sql += ' ORDER BY t.path'
+    if limit:
+        sql += f' LIMIT {int(limit)}'
+    return sql, params
+
+
+def query_results(conn, filters, count_by=None, limit=None):
+    """Run a latest-run query and return the rows."""
+    sql, params = build_query(filters, count_by, limit)
+    return conn.execute(sql, params).fetchall()
+
+
+#########################################
+# MAIN
+#########################################
+def main():
+    parser = argparse.ArgumentParser(description="Load and query analysis results in SQLite.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load = subparsers.add_parser('load', help='Upsert records into the database')
+    load.add_argument('db', help='SQLite database file (created if missing)')
+    load.add_argument('source', help='Directory of JSON/JSONL files, a JSONL[.gz] file, or - for stdin')
+
+    query = subparsers.add_parser('query', help='Query the latest run of every testcase')
+    query.add_argument('db', help='SQLite database file')
+    query.add_argument('--bucket', action='append', help='Bucket (repeat for several)')
+    query.add_argument('--owner', action='append', help='Bucket owner')
+    query.add_argument('--reviewer', action='append', help='Reviewer')
+    query.add_argument('--status', action='append', help='Status (Pass, Fail, Killed, NOTRUN, Ignored, ...)')
+    query.add_argument('--reason', action='append', help='failure_reason (e.g. "Exit status")')
+    query.add_argument('--command', action='append', help='failing_command')
+    query.add_argument('--diff-file', action='append', help='Has this *.diff.bak file')
+    query.add_argument('--exit-change', action='append', type=parse_exit_change, metavar='COMMAND[:GOLD[:ACTUAL]]',
+                       help='Exit code of COMMAND differs from the gold (e.g. build_model:0:5, build_model, ::139)')
+    query.add_argument('--signal', action='append', help='A command died of this signal (e.g. SIGSEGV)')
+    query.add_argument('--count-by', choices=sorted(COUNT_BY), default=None,
+                       help='Count matching testcases per value instead of listing them')
+    query.add_argument('--limit', type=int, default=None, help='Maximum rows')
+    query.add_argument('--jsonl', action='store_true', help='Print the stored records as JSON Lines')
+    query.add_argument('--sql', action='store_true', help='Print the generated SQL and exit')
+    args = parser.parse_args()
+
+    if args.command == 'query' and not os.path.exists(args.db):
+        print(f"❌ ERROR: Database does not exist: {args.db}")
+        sys.exit(1)
+    try:
+        conn = open_store(args.db)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+
+    try:
+        if args.command == 'load':
+            try:
+                stored, skipped = store_results(conn, iter_records(args.source))
+            except (OSError, ValueError) as e:
+                print(f"Error reading records: {e}", file=sys.stderr)
+                sys.exit(1)
+            print(f"✅ {stored} results stored in {args.db} ({skipped} records skipped)")
+            return
+
+        filters = {key: getattr(args, key) for key in [*QUERY_FILTERS, 'diff_file', 'exit_change', 'signal']}
+        if args.sql:
+            print(build_query(filters, args.count_by, args.limit))
+            return
+        rows = query_results(conn, filters, args.count_by, args.limit)
+        if args.count_by:
+            for row in rows:
+                print(f"{row['testcases']:>7}  {row['value']}")
+        elif args.jsonl:
+            for row in rows:
+                print(row['record'])
+        else:
+            for row in rows:
+                print(f"{row['status']:<7} {row['failure_reason'] or '':<14} {row['failing_command'] or '':<24} "
+                      f"{row['owner'] or '':<12} {row['path']}")
+        print(f"{len(rows)} row(s)", file=sys.stderr)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Differential tests: read_makefile() against `make -n`.
+
+Each case writes a testcase Makefile (plus includes) to a temporary
+directory and checks that the in-process reader resolves the same
+testresults/logs order that get_makefile_order() would scrape from
+`make -n`, or that it reports the construct as unsupported so the real
+make is used. Skipped when make is not installed.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analyze_testcase as analyzer
+from analyze_testcase import get_makefile_order, read_makefile, run_make_dry_run
+
+# Include in the layout of etautotest/tools/Makefile_root
+MAKEFILE_ROOT = """\
+GLOBAL_NEWCMD_OPTIONS = log=no messagecounteach=10
+OUTDIR ?= .
+MODE := fast
+ifeq ($(MODE),fast)
+  GLOBAL_BUILD_MODEL_OPTIONS = speed=1
+else
+  GLOBAL_BUILD_MODEL_OPTIONS = speed=0
+endif
+.PHONY: all mkdir $(TEST_TARGETS) $(VERIFY_TARGETS)
+all: mkdir $(TEST_TARGETS) $(VERIFY_TARGETS)
+mkdir:
+\t@mkdir -p testresults/logs
+build_model:
+\t-build_model $(GLOBAL_NEWCMD_OPTIONS) $(LOCAL_BUILD_MODEL_OPTIONS) $(GLOBAL_BUILD_MODEL_OPTIONS) \\
+\t  > $(OUTDIR)/testresults/logs/log_$@>
+\tsh -c "echo EXIT STATUS for $@ is $$? " >> $(OUTDIR)/status.log
+create_logic_tests: build_model
+\tcreate_logic_tests $< > $(OUTDIR)/testresults/logs/log_$@>
+verify_tests:
+\t@verify $^ > $(OUTDIR)/testresults/logs/log_$@>
+status_diff:
+\t@cdsDiff.pl golds/status.log status.log > status.diff
+build_model_diff:
+\t@cdsDiff.pl golds/log_build_model testresults/logs/log_build_model > testresults/logs/build_model.diff.bak>
+"""
+
+
+@unittest.skipUnless(shutil.which('make'), 'make is not installed')
+class ReadMakefileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.old_cache_dir = analyzer.CACHE_DIR
+        analyzer.configure_cache(None)
+        self.testcase = tempfile.mkdtemp(prefix='read_makefile_')
+
+    def tearDown(self):
+        analyzer.configure_cache(self.old_cache_dir)
+        shutil.rmtree(self.testcase, ignore_errors=True)
+
+    def write(self, name, content):
+        with open(os.path.join(self.testcase, name), 'w') as f:
+            f.write(textwrap.dedent(content))
+
+    def assert_matches_make(self):
+        """read_makefile() must agree with make -n; returns its result."""
+        expected = run_make_dry_run(self.testcase)
+        self.assertIsNotNone(expected, 'make -n failed to run')
+        info = read_makefile(self.testcase)
+        self.assertIsNone(info['unsupported'])
+        self.assertEqual(info['order'], expected)
+        self.assertEqual(get_makefile_order(self.testcase), expected)
+        return info
+
+    def assert_falls_back(self, construct):
+        """read_makefile() must give up on construct; get_makefile_order() then matches make -n."""
+        info = read_makefile(self.testcase)
+        self.assertIsNone(info['order'])
+        self.assertIn(construct, info['unsupported'])
+        with self.assertLogs('analyze_testcase', 'WARNING') as logs:
+            order = get_makefile_order(self.testcase)
+        self.assertIn('make -n', logs.output[0])
+        self.assertEqual(order, run_make_dry_run(self.testcase))
+
+    def test_root_include(self):
+        self.write('Makefile_root', MAKEFILE_ROOT)
+        self.write('Makefile', """\
+            TOP = .
+            TEST_TARGETS = build_model create_logic_tests
+            VERIFY_TARGETS = status_diff build_model_diff
+            LOCAL_BUILD_MODEL_OPTIONS = cell=TOP \\
+               workdir=$(CURDIR)/w   # comment
+            include $(TOP)/Makefile_root
+            """)
+        info = self.assert_matches_make()
+        self.assertEqual(len(info['order']), 3)
+        self.assertEqual(info['local_options']['BUILD_MODEL'], f'cell=TOP workdir={self.testcase}/w')
+
+    def test_assignment_flavors(self):
+        self.write('Makefile', """\
+            A = first
+            A ?= ignored
+            B ?= default
+            C := $(A)
+            A += second
+            C += $(B)
+            D = $(E)
+            E = late
+            D += more
+            all:
+            \techo $(A) $(B) $(C) $(D) > testresults/logs/log_$(A)_$(C)>
+            \techo > testresults/logs/log_$(word)_$(D)>
+            """)
+        self.assert_matches_make()
+
+    def test_conditionals(self):
+        self.write('Makefile', """\
+            MODE = slow
+            ifneq "$(MODE)" "fast"
+              LOGS = slow_log
+            else
+              LOGS = fast_log
+            endif
+            ifdef UNDEFINED_VARIABLE
+              LOGS += undefined
+            endif
+            ifndef UNDEFINED_VARIABLE
+              LOGS += not_defined
+            endif
+            ifeq ($(MODE),slow)
+              ifeq ($(LOGS),)
+                LOGS += empty
+              endif
+            endif
+            all: $(LOGS)
+            slow_log not_defined:
+            \t@run $@ > testresults/logs/log_$@>
+            """)
+        self.assert_matches_make()
+
+    def test_optional_include(self):
+        self.write('extra.mk', """\
+            EXTRA = extra
+            """)
+        self.write('Makefile', """\
+            -include missing.mk
+            sinclude extra.mk
+            all: first $(EXTRA)
+            first extra:
+            \t@run $@ > testresults/logs/log_$@>
+            """)
+        self.assert_matches_make()
+
+    def test_recipe_prefixes_and_prerequisites(self):
+        self.write('Makefile', """\
+            .PHONY: all a b c
+            all: c a b a
+            a: b
+            \t-@run a > testresults/logs/log_a>
+            b:
+            \t@ run b > testresults/logs/log_b>
+            c: ; run c > testresults/logs/log_c>
+            """)
+        self.assert_matches_make()
+
+    def test_plus_prefix(self):
+        self.write('Makefile', """\
+            all:
+            \t+@true > testresults/logs/log_true>
+            """)
+        self.assert_falls_back('+ recipe prefix')
+
+    def test_default_goal_override(self):
+        self.write('Makefile', """\
+            first:
+            \trun first > testresults/logs/log_first>
+            second: first
+            \trun second > testresults/logs/log_second>
+            .DEFAULT_GOAL := second
+            """)
+        self.assert_matches_make()
+
+    def test_target_specific_variable(self):
+        self.write('Makefile', """\
+            OPT = global
+            all: OPT = local
+            all:
+            \trun $(OPT) > testresults/logs/log_$(OPT)>
+            """)
+        self.assert_falls_back('target-specific variable')
+
+    def test_shell_function(self):
+        self.write('Makefile', """\
+            NAME := $(shell echo from_shell)
+            all:
+            \trun > testresults/logs/log_$(NAME)>
+            """)
+        self.assert_falls_back('shell')
+
+    def test_pattern_rule(self):
+        self.write('Makefile', """\
+            all: one.run two.run
+            %.run:
+            \trun $* > testresults/logs/log_$*>
+            """)
+        self.assert_falls_back('no explicit rule')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Watch a release or bucket directory during a regression run and analyze
+testcases as they finish.
+
+A testcase is (re-)analyzed once its test.out, test.log or a *.diff.bak
+file is written and has been quiet for --settle seconds. Changes are
+picked up with inotify on local filesystems; on NFS (where inotify does
+not see writes from other hosts), when inotify is unavailable or its
+watch limit is hit, the watcher polls directory/test.out/test.log mtimes
+every --interval seconds instead (three stats per testcase).
+
+Usage:
+    python3 watch_release.py <release_root|bucket_dir> [--jsonl -o results.jsonl] [--index report_dir]
+
+Results are printed, appended to a JSON Lines stream (--jsonl), and/or
+kept in a triage dashboard (--index: report pages plus index.html,
+rebuilt at most every --interval seconds). Stop with Ctrl-C.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from analyze_testcase import (analyze_many, configure_cache, discover_testcases, infer_platform,
+                              is_pruned_directory, open_jsonl_output, print_batch_line, project_fields,
+                              split_control_skipped, testcase_control_files, walk_release,
+                              write_jsonl_record)
+from generate_index import RECORD_FIELDS, generate_index
+from generate_report import STYLESHEET_NAME, report_filename, write_report
+
+#########################################
+# Constants
+#########################################
+WATCHED_FILES = ('test.out', 'test.log')
+WATCHED_SUFFIX = '.diff.bak'
+
+# Filesystems where inotify misses changes made by other hosts
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'lustre', 'gpfs', 'fuse.sshfs', 'afs'}
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+#########################################
+# Change Detection
+#########################################
+
+def is_network_filesystem(path):
+    """Return True if path lives on a network filesystem (per /proc/mounts)."""
+    path = os.path.realpath(path)
+    best, fstype = '', None
+    try:
+        with open('/proc/mounts') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount = parts[1].replace('\\040', ' ')
+                if (path == mount or path.startswith(mount.rstrip('/') + '/')) and len(mount) > len(best):
+                    best, fstype = mount, parts[2]
+    except OSError:
+        return False
+    return fstype in NETWORK_FILESYSTEMS
+
+
+def is_watched_name(name):
+    """Return True for file names whose change means a testcase result changed."""
+    return name in WATCHED_FILES or name.endswith(WATCHED_SUFFIX)
+
+
+def testcase_signature(testcase):
+    """mtimes of the testcase directory (new/removed diff.bak files), test.out and test.log."""
+    signature = []
+    for name in ('', *WATCHED_FILES):
+        try:
+            signature.append(os.stat(os.path.join(testcase, name)).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def poll_changes(signatures, testcases=None):
+    """
+    Compare current signatures with the known ones (updating them).
+    testcases defaults to the known set; pass a fresh discovery to pick up
+    new testcases. Returns the testcases whose signature changed.
+    """
+    changed = []
+    for testcase in (signatures if testcases is None else testcases):
+        signature = testcase_signature(testcase)
+        if signatures.get(testcase) != signature:
+            signatures[testcase] = signature
+            changed.append(testcase)
+    return changed
+
+
+def inotify_open():
+    """Return a watcher dict ({'libc', 'fd', 'watches'}) or None if inotify is unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    return {'libc': libc, 'fd': fd, 'watches': {}}
+
+
+def inotify_watch_tree(watcher, root):
+    """
+    Watch root and every directory below it that batch discovery
+    (walk_release) enters: testcase directories are watch leaves and
+    tbdata/, testresults/, golds.* etc. are never watched.
+    Returns the testcases found under root.
+    Raises OSError (e.g. ENOSPC when fs.inotify.max_user_watches is hit).
+    """
+    def watch(dirpath):
+        wd = watcher['libc'].inotify_add_watch(watcher['fd'], os.fsencode(dirpath), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f'inotify_add_watch {dirpath}: {os.strerror(error)}')
+        watcher['watches'][wd] = dirpath
+
+    return [path for path, _ in walk_release(root, visit=watch)]
+
+
+def inotify_read(watcher, timeout):
+    """
+    Wait up to timeout seconds for events.
+    Returns (changed testcase dirs, new directories, overflowed).
+    """
+    changed, created, overflow = set(), [], False
+    ready, _, _ = select.select([watcher['fd']], [], [], timeout)
+    if not ready:
+        return changed, created, overflow
+    data = os.read(watcher['fd'], 1 << 16)
+    offset = 0
+    while offset < len(data):
+        wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+        name = os.fsdecode(data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b'\0'))
+        offset += INOTIFY_EVENT.size + length
+        if mask & IN_Q_OVERFLOW:
+            overflow = True
+            continue
+        directory = watcher['watches'].get(wd)
+        if mask & IN_IGNORED:
+            watcher['watches'].pop(wd, None)
+            continue
+        if directory is None:
+            continue
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                created.append(os.path.join(directory, name))
+        elif is_watched_name(name):
+            changed.add(directory)
+    return changed, created, overflow
+
+
+#########################################
+# Results
+#########################################
+
+def emit_results(results, out, index_dir, index_records):
+    """Print / stream each result and refresh its report page. Returns the number of errors."""
+    errors = 0
+    for result in results:
+        if 'error' in result:
+            errors += 1
+        if out:
+            write_jsonl_record(out, result)
+        else:
+            print_batch_line(result)
+        if index_dir and 'error' not in result:
+            write_report(result, os.path.join(index_dir, report_filename(result)), STYLESHEET_NAME)
+            index_records[result['testcase_path']] = project_fields(result, RECORD_FIELDS)
+    return errors
+
+
+#########################################
+# Watch Loop
+#########################################
+
+def watch_release(root, out=None, index_dir=None, interval=30, settle=5, workers=None,
+                  poll=False, rescan=10, initial=True, platform=None, features=()):
+    """
+    Analyze testcases under root as they change, until interrupted.
+
+    Changed testcases wait until they have been quiet for settle seconds,
+    then are analyzed together on a thread pool (analyze_many). Polling
+    re-discovers new testcases every rescan intervals; inotify sees new
+    directories directly. Testcases skipped by a control file get the same
+    compact Ignored record as in batch sweeps (platform defaults to
+    infer_platform(root)).
+    """
+    root = os.path.abspath(root)
+    platform = platform or infer_platform(root)
+    signatures = {}
+    poll_changes(signatures, discover_testcases(root))
+    index_records = {}
+    if index_dir:
+        os.makedirs(index_dir, exist_ok=True)
+
+    watcher = None
+    if not poll:
+        if is_network_filesystem(root):
+            print(f"📡 {root} is on a network filesystem, polling every {interval}s", file=sys.stderr)
+        else:
+            watcher = inotify_open()
+            try:
+                if watcher:
+                    inotify_watch_tree(watcher, root)
+            except OSError as e:
+                print(f"⚠️  inotify unavailable ({e}), polling every {interval}s", file=sys.stderr)
+                os.close(watcher['fd'])
+                watcher = None
+    mode = 'inotify' if watcher else 'polling'
+    print(f"👀 Watching {len(signatures)} testcases under {root} ({mode})", file=sys.stderr)
+
+    due = {testcase: 0 for testcase in signatures} if initial else {}
+    last_poll = last_index = time.monotonic()
+    cycles = 0
+    index_dirty = False
+    while True:
+        now = time.monotonic()
+        if watcher:
+            changed, created, overflow = inotify_read(watcher, min(settle, interval))
+            for directory in created:
+                # Same testcase set as batch discovery: nothing inside a testcase or a pruned subtree
+                if is_pruned_directory(os.path.basename(directory)) or os.path.dirname(directory) in signatures:
+                    continue
+                try:
+                    found = inotify_watch_tree(watcher, directory)
+                except OSError as e:
+                    print(f"⚠️  Cannot watch {directory}: {e}", file=sys.stderr)
+                    found = discover_testcases(directory)
+                changed.update(found)
+            if overflow:
+                changed.update(poll_changes(signatures, discover_testcases(root)))
+            for testcase in changed:
+                # Known testcases are watch leaves (see the created check above)
+                signatures.setdefault(testcase, None)
+                due[testcase] = time.monotonic()
+        else:
+            if now - last_poll >= interval:
+                cycles += 1
+                # New testcases only show up in a fresh walk; the rest is three stats each
+                testcases = discover_testcases(root) if cycles % rescan == 0 else None
+                for testcase in poll_changes(signatures, testcases):
+                    due[testcase] = now
+                last_poll = now
+            time.sleep(min(settle, interval, 1))
+
+        now = time.monotonic()
+        ready = sorted(testcase for testcase, changed_at in due.items() if now - changed_at >= settle)
+        if ready:
+            for testcase in ready:
+                del due[testcase]
+            skipped = []
+            testcases = list(split_control_skipped(((testcase, testcase_control_files(testcase)) for testcase in ready),
+                                                   skipped, platform, features))
+            emit_results(skipped, out, index_dir, index_records)
+            emit_results(analyze_many(testcases, max_workers=workers), out, index_dir, index_records)
+            index_dirty = bool(index_dir)
+        if index_dirty and (now - last_index >= interval or not due):
+            generate_index(iter(index_records.values()), index_dir, title=root)
+            index_dirty = False
+            last_index = now
+
+
+#########################################
+# MAIN
+#########################################
+def main():
+    parser = argparse.ArgumentParser(description="Analyze testcases as they finish during a regression run.")
+    parser.add_argument('root', help='Release root or bucket directory to watch')
+    parser.add_argument('--jsonl', action='store_true', help='Write results as JSON Lines')
+    parser.add_argument('--output', '-o', default=None,
+                        help='Append --jsonl records to this file instead of stdout (.gz compresses)')
+    parser.add_argument('--index', default=None, metavar='DIR',
+                        help='Keep report pages and a triage index.html up to date in DIR')
+    parser.add_argument('--interval', type=float, default=30,
+                        help='Polling / index refresh interval in seconds (default: 30)')
+    parser.add_argument('--settle', type=float, default=5,
+                        help='Seconds a testcase must be quiet before it is analyzed (default: 5)')
+    parser.add_argument('--rescan', type=int, default=10,
+                        help='Polling: look for new testcases every N intervals (default: 10)')
+    parser.add_argument('--workers', type=int, default=None, help='Analysis threads')
+    parser.add_argument('--poll', action='store_true', help='Always poll, never use inotify')
+    parser.add_argument('--no-initial', action='store_true',
+                        help='Only analyze testcases that change after startup')
+    parser.add_argument('--platform', default=None,
+                        help='Platform for SKIP_<platform>/ON_<platform> control files (default: inferred from the path)')
+    parser.add_argument('--feature', action='append', default=[],
+                        help='Skip testcases with IGNORE.<FEATURE> (repeat for several)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"❌ ERROR: Directory does not exist: {os.path.abspath(args.root)}")
+        sys.exit(1)
+    if args.no_cache:
+        configure_cache(None)
+
+    out = open_jsonl_output(args.output, append=True) if args.jsonl else None
+    try:
+        watch_release(args.root, out, args.index, args.interval, args.settle, args.workers,
+                      args.poll, max(args.rescan, 1), not args.no_initial, args.platform, args.feature)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out and out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()